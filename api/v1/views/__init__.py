@@ -1,9 +1,107 @@
-from flask import Blueprint
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from flask import Blueprint, current_app, jsonify, request
+from flask import stream_with_context
+import json
+from models import storage, storage_t
+from models.base_model import encode, format_time, parse_time
+from os import getenv
+from urllib.parse import urlencode
 
 
 app_views = Blueprint('app_views', __name__,
                       url_prefix='/api/v1')
 
+# int - bytes of JSON gathered before a chunk of a list response is sent
+chunk_size = 1 << 16
+
+# int - most objects a collection endpoint returns at once, the page size
+# when no limit is asked for (HBNB_API_MAX_LIMIT)
+max_limit = int(getenv('HBNB_API_MAX_LIMIT', 1000))
+
+
+def jsonify_page(cls, fk=None, value=None, exclude=()):
+    """Returns the JSON response of the page of cls objects (whose foreign
+    key attribute fk holds value if fk is given) the limit and cursor
+    query parameters ask for, in created_at then id order. The URL of the
+    next page, if any, is given in a Link header with rel="next". limit
+    defaults to and is capped at max_limit"""
+    try:
+        limit = min(int(request.args.get('limit', max_limit)), max_limit)
+    except ValueError:
+        limit = 0
+    if limit < 1:
+        return jsonify({"message": "Invalid limit"}), 400
+    cursor = request.args.get('cursor')
+    after = None
+    if cursor:
+        try:
+            created_at, id = json.loads(urlsafe_b64decode(
+                cursor + "=" * (-len(cursor) % 4)))
+            after = (parse_time(created_at), str(id))
+            if after[0].tzinfo is not None:
+                raise ValueError(created_at)
+        except (ValueError, TypeError):
+            return jsonify({"message": "Invalid cursor"}), 400
+    objs = storage.page(cls, limit + 1, after, fk, value)
+    response = jsonify_list(objs[:limit], exclude)
+    if len(objs) > limit:
+        last = objs[limit - 1]
+        cursor = urlsafe_b64encode(json.dumps(
+            [format_time(last.created_at), last.id]).encode()).decode()
+        response.headers["Link"] = '<{}?{}>; rel="next"'.format(
+            request.base_url,
+            urlencode({"limit": limit, "cursor": cursor.rstrip("=")}))
+    return response
+
+
+def jsonify_list(objs, exclude=()):
+    """Returns the JSON response of the list of to_dict() of objs, streamed
+    in chunks as objs (any iterable, e.g. storage.iter_all()) is consumed,
+    so the objects and the body never have to be held at once. Objects
+    contribute the JSON bytes they cache; in db mode their dictionaries
+    are encoded with the keys in exclude (relationships loaded by
+    SQLAlchemy) removed first. The first chunk is built before the
+    response is returned, so that an error there still answers 500; one
+    raised later, once the status is sent, is logged and cuts the body
+    short"""
+    def generate():
+        """yields the body of the response in chunks"""
+        chunk = [b"["]
+        size = 0
+        sep = b""
+        for obj in objs:
+            if storage_t == 'db':
+                obj_dict = obj.to_dict()
+                for key in exclude:
+                    obj_dict.pop(key, None)
+                body = encode(obj_dict)
+            else:
+                body = obj.to_json()
+            chunk.append(sep + body)
+            sep = b","
+            size += len(body)
+            if size >= chunk_size:
+                yield b"".join(chunk)
+                chunk = []
+                size = 0
+        chunk.append(b"]\n")
+        yield b"".join(chunk)
+
+    chunks = generate()
+    first = next(chunks)
+
+    def stream():
+        """yields the first chunk then the others, logging an error"""
+        yield first
+        try:
+            yield from chunks
+        except Exception:
+            current_app.logger.exception("list response cut short")
+            raise
+    return current_app.response_class(stream_with_context(stream()),
+                                      mimetype="application/json")
+
+
 from api.v1.views.index import *
 from api.v1.views.states import *
 from api.v1.views.cities import *
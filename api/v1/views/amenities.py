@@ -3,7 +3,7 @@
 functions"""
 from models import storage
 from models.amenity import Amenity
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_page
 from flask import jsonify, abort, request
 from werkzeug.exceptions import BadRequest
 
@@ -14,9 +14,7 @@ from werkzeug.exceptions import BadRequest
 def get_amenities(amenity_id=None):
     """Retrieve a list of all amenities, or a one specified"""
     if amenity_id is None:
-        ameni_lst = [ameni.to_dict() for ameni in
-                     storage.all(Amenity).values()]
-        return jsonify(ameni_lst)
+        return jsonify_page(Amenity)
     ameni_ob = storage.get(Amenity, amenity_id)
     if ameni_ob is None:
         return abort(404)
@@ -5,7 +5,7 @@ Import this module in __init__ of this package.
 """
 from models import storage
 from models.state import State, City
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_page
 from flask import abort, jsonify
 from flask import request
 from werkzeug.exceptions import BadRequest
@@ -15,11 +15,9 @@ from werkzeug.exceptions import BadRequest
                  strict_slashes=False)
 def get_state_cities(state_id):
     """Retrieves the list of all City objects of a State."""
-    state = storage.get(State, state_id)
-    if state is None:
+    if storage.get(State, state_id) is None:
         return abort(404)
-    all_cities = [city.to_dict() for city in state.cities]
-    return jsonify(all_cities)
+    return jsonify_page(City, "state_id", state_id)
 
 
 @app_views.route('/cities/<city_id>', methods=['GET'],
@@ -3,12 +3,7 @@
 from api.v1.views import app_views
 from flask import jsonify
 import models
-from models.amenity import Amenity
-from models.city import City
-from models.place import Place
-from models.review import Review
-from models.state import State
-from models.user import User
+from models.base_model import cache_stats
 
 
 @app_views.route('/status', strict_slashes=False)
@@ -20,11 +15,23 @@ def status():
 @app_views.route('/stats', strict_slashes=False)
 def objects():
     """Retrieves the number of each objects by type"""
+    counts = models.storage.counts()
     return jsonify({
-            "amenities": models.storage.count(Amenity),
-            "cities": models.storage.count(City),
-            "places": models.storage.count(Place),
-            "reviews": models.storage.count(Review),
-            "states": models.storage.count(State),
-            "users": models.storage.count(User)
+            "amenities": counts["Amenity"],
+            "cities": counts["City"],
+            "places": counts["Place"],
+            "reviews": counts["Review"],
+            "states": counts["State"],
+            "users": counts["User"]
+            })
+
+
+@app_views.route('/stats/cache', strict_slashes=False)
+def cache():
+    """Retrieves the hit rate of the serialization cache of the models"""
+    lookups = cache_stats["hits"] + cache_stats["misses"]
+    return jsonify({
+            "hits": cache_stats["hits"],
+            "misses": cache_stats["misses"],
+            "hit_rate": cache_stats["hits"] / lookups if lookups else 0.0
             })
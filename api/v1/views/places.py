@@ -1,12 +1,10 @@
 #!/usr/bin/python3
 """View module for Place objects - handles all default RESTful API actions."""
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_list, jsonify_page
 from models import storage
 from models.place import Place
 from models.city import City
-from models.state import State
 from models.user import User
-from models.amenity import Amenity
 from flask import jsonify, abort, request
 from werkzeug.exceptions import BadRequest
 
@@ -15,11 +13,9 @@ from werkzeug.exceptions import BadRequest
                  strict_slashes=False)
 def get_city_places(city_id):
     """retrieves a list of all Place objects of a City."""
-    city = storage.get(City, city_id)
-    if city is None:
+    if storage.get(City, city_id) is None:
         return abort(404)
-    all_places = [place.to_dict() for place in city.places]
-    return jsonify(all_places)
+    return jsonify_page(Place, "city_id", city_id, exclude=('amenities',))
 
 
 @app_views.route('/places/<place_id>', methods=['GET'],
@@ -99,47 +95,17 @@ def retrieve_all_places():
         states = data.get('states', None)
         cities = data.get('cities', None)
         amenities = data.get('amenities', None)
+        for ids in (states, cities, amenities):
+            if ids is not None and (type(ids) is not list or any(
+                    type(id) is not str for id in ids)):
+                return jsonify({'message': 'Not a list of ids'}), 400
 
     if not data or not len(data) or (
             not states and
             not cities and
             not amenities):
-        places = storage.all(Place).values()
-        list_places = []
-        for place in places:
-            list_places.append(place.to_dict())
-        return jsonify(list_places)
-
-    list_places = []
-    if states:
-        states_obj = [storage.get(State, s_id) for s_id in states]
-        for state in states_obj:
-            if state:
-                for city in state.cities:
-                    if city:
-                        for place in city.places:
-                            list_places.append(place)
-
-    if cities:
-        city_obj = [storage.get(City, c_id) for c_id in cities]
-        for city in city_obj:
-            if city:
-                for place in city.places:
-                    if place not in list_places:
-                        list_places.append(place)
-
-    if amenities:
-        if not list_places:
-            list_places = storage.all(Place).values()
-        amenities_obj = [storage.get(Amenity, a_id) for a_id in amenities]
-        list_places = [place for place in list_places
-                       if all([am in place.amenities
-                               for am in amenities_obj])]
-
-    places = []
-    for p in list_places:
-        d = p.to_dict()
-        d.pop('amenities', None)
-        places.append(d)
-
-    return jsonify(places)
+        return jsonify_list(storage.iter_all(Place))
+
+    return jsonify_list(storage.search_places(states or (), cities or (),
+                                              amenities or ()),
+                        exclude=('amenities',))
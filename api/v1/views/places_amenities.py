@@ -1,7 +1,7 @@
 #!/usr/bin/python3
 """View for the link between Place objects and Amenity objects. -\
 handles all RESTful API actions."""
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_list
 from models import storage
 from flask import jsonify, abort, request
 from models.place import Place
@@ -15,11 +15,11 @@ if storage_t == 'db':
                      strict_slashes=False)
     def get_place_amenities(place_id):
         """Retrieves a list of all Amenity objects of a Place."""
-        place = storage.get(Place, place_id)
+        place = storage.get(Place, place_id, eager=("amenities",),
+                            loader="joined")
         if place is None:
             return abort(404)
-        amenities = [amty.to_dict() for amty in place.amenities]
-        return jsonify(amenities)
+        return jsonify_list(place.amenities)
 
     @app_views.route('/places/<place_id>/amenities/<amenity_id>',
                      methods=['DELETE'], strict_slashes=False)
@@ -61,8 +61,7 @@ else:
         place = storage.get(Place, place_id)
         if place is None:
             return abort(404)
-        amenities = [ame.to_dict() for ame in place.amenities]
-        return jsonify(amenities)
+        return jsonify_list(place.amenities)
 
     @app_views.route('/places/<place_id>/amenities/<amenity_id>',
                      methods=['DELETE'], strict_slashes=False)
@@ -1,6 +1,6 @@
 #!/usr/bin/python3
 """View module for Review objects - handles all default RESTful API actions"""
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_page
 from models import storage
 from models.review import Review
 from flask import jsonify, abort, request
@@ -13,11 +13,9 @@ from models.user import User
                  strict_slashes=False)
 def get_reviews(place_id):
     """Retrieves list of all Review objects of a Place."""
-    place = storage.get(Place, place_id)
-    if place is None:
+    if storage.get(Place, place_id) is None:
         return abort(404)
-    reviews_list = [rev.to_dict() for rev in place.reviews]
-    return jsonify(reviews_list)
+    return jsonify_page(Review, "place_id", place_id)
 
 
 @app_views.route('/reviews/<review_id>', methods=['GET'],
@@ -3,7 +3,7 @@
 RESTful API actions"""
 from models import storage
 from models.state import State
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_page
 from flask import jsonify, abort, request
 from werkzeug.exceptions import BadRequest
 
@@ -12,11 +12,7 @@ from werkzeug.exceptions import BadRequest
 def get_states():
     """Retrieve list of all State objects."""
 
-    states_dct = storage.all(State)
-    states_lst = []
-    for obj in states_dct.values():
-        states_lst.append(obj.to_dict())
-    return jsonify(states_lst)
+    return jsonify_page(State)
 
 
 @app_views.route('/states/<state_id>', methods=['GET'],
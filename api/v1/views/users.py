@@ -2,7 +2,7 @@
 """View for User objects - handles all defaul RESTful API actions."""
 from models import storage
 from models.user import User
-from api.v1.views import app_views
+from api.v1.views import app_views, jsonify_page
 from flask import jsonify, abort, request
 from werkzeug.exceptions import BadRequest
 
@@ -13,8 +13,7 @@ from werkzeug.exceptions import BadRequest
 def get_users(user_id=None):
     """Retrieves a list of all users or one user if id specified."""
     if user_id is None:
-        user_ls = [user.to_dict() for user in storage.all(User).values()]
-        return jsonify(user_ls)
+        return jsonify_page(User)
     user_ls = storage.get(User, user_id)
     if user_ls is None:
         return abort(404)
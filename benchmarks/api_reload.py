@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Measures the API request throughput with a large file.json, once with the
+teardown reload skipping the unchanged file and once with it forced to
+deserialize the whole file after every request, as it used to.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/api_reload.py [number of objects] [requests]
+(defaults to 50000 objects and 200 requests)
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+
+def make_file(size):
+    """writes a file.json of size users in the current directory"""
+    now = time.strftime("%Y-%m-%dT%H:%M:%S.000000")
+    objects = {}
+    for i in range(size):
+        obj_id = str(uuid.uuid4())
+        objects["User." + obj_id] = {"__class__": "User", "id": obj_id,
+                                     "created_at": now, "updated_at": now,
+                                     "email": "user{}@hbnb.io".format(i)}
+    with open("file.json", "w") as f:
+        json.dump(objects, f, indent=4)
+
+
+def run(client, requests, before=None):
+    """returns the requests per second of GET /api/v1/status"""
+    start = time.perf_counter()
+    for i in range(requests):
+        if before:
+            before()
+        client.get("/api/v1/status")
+    return requests / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    os.chdir(tempfile.mkdtemp())
+    make_file(size)
+    from api.v1.app import app
+    from models.engine.file_storage import FileStorage
+
+    def full_reload():
+        """makes the next reload deserialize every record again"""
+        FileStorage._FileStorage__signature = None
+        FileStorage._FileStorage__versions = {}
+
+    client = app.test_client()
+    print("{} objects".format(size))
+    print("full reload  {:10.1f} req/s".format(
+        run(client, max(requests // 20, 1), full_reload)))
+    print("incremental  {:10.1f} req/s".format(run(client, requests)))
@@ -0,0 +1,75 @@
+#!/usr/bin/python3
+"""
+Measures the reviews per second each storage engine writes, saving them
+one by one with BaseModel.save() (one write or commit per review) and
+all at once with storage.bulk_new().
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/bulk_insert.py [number of reviews]
+(defaults to 100000 reviews; the one by one runs write the first 1000
+only; db mode uses HBNB_DB_URL, or a temporary SQLite file)
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# reviews written one by one, the rate of the rest would be the same
+one_by_one = 1000
+
+
+def reviews(size, place_id, user_id):
+    """returns size new reviews of the place by the user"""
+    from models.review import Review
+    return [Review(text="Great stay " * 5, place_id=place_id,
+                   user_id=user_id) for i in range(size)]
+
+
+def rate(label, size, write):
+    """prints the reviews per second write() saves size reviews at"""
+    start = time.perf_counter()
+    write()
+    elapsed = time.perf_counter() - start
+    print("{:4} {:12} {:8} reviews  {:7.2f}s  {:9.0f} reviews/s".format(
+        os.environ["HBNB_TYPE_STORAGE"], label, size, elapsed,
+        size / elapsed))
+
+
+def run(size):
+    """runs the benchmark with the storage engine of the environment"""
+    import models
+    from models.city import City
+    from models.place import Place
+    from models.state import State
+    from models.user import User
+    storage = models.storage
+    state = State(name="California")
+    city = City(name="San Francisco", state_id=state.id)
+    user = User(email="betty@hbnb.io", password="pwd")
+    place = Place(name="Loft", city_id=city.id, user_id=user.id)
+    storage.bulk_new([state, city, user, place])
+    slow = reviews(min(size, one_by_one), place.id, user.id)
+    rate("one by one", len(slow),
+         lambda: [review.save() for review in slow])
+    rate("bulk_new", size,
+         lambda: storage.bulk_new(reviews(size, place.id, user.id)))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    if os.environ.get("HBNB_TYPE_STORAGE"):
+        run(size)
+        sys.exit()
+    tmp = tempfile.mkdtemp()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # the children run in tmp, where a relative PYTHONPATH finds nothing
+    path = os.environ.get("PYTHONPATH")
+    path = root + os.pathsep + path if path else root
+    for engine in ("file", "db"):
+        env = dict(os.environ, HBNB_TYPE_STORAGE=engine, PYTHONPATH=path)
+        env.setdefault("HBNB_DB_URL", "sqlite:///" + os.path.join(
+            tmp, "hbnb.db"))
+        env.pop("HBNB_ENV", None)
+        subprocess.run([sys.executable, os.path.abspath(__file__),
+                        str(size)], env=env, cwd=tmp, check=True)
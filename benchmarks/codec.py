@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+"""
+Compares the size of the JSON and binary snapshots of the same objects and
+the time FileStorage.reload() takes to load each of them.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/codec.py [number of objects]
+(defaults to 1000000 objects)
+"""
+import os
+import sys
+import tempfile
+import time
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+def fill(storage, size):
+    """adds size objects, a third each of users, places and reviews"""
+    for i in range(size // 3):
+        user = User(email="user{}@hbnb.io".format(i), first_name="Betty",
+                    last_name="Holberton")
+        place = Place(name="place{}".format(i), user_id=user.id,
+                      city_id="city", number_rooms=3, latitude=37.7)
+        review = Review(text="Great stay " * 5, user_id=user.id,
+                        place_id=place.id)
+        for obj in (user, place, review):
+            storage.new(obj)
+
+
+def empty():
+    """forgets every object held by FileStorage"""
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__classes = {}
+    FileStorage._FileStorage__indexes = {}
+    FileStorage._FileStorage__versions = {}
+    FileStorage._FileStorage__signature = None
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    tmp = tempfile.mkdtemp()
+    storage = FileStorage()
+    empty()
+    fill(storage, size)
+    print("{} objects".format(len(storage.all())))
+    for codec in ("json", "binary"):
+        path = os.path.join(tmp, "file." + codec)
+        FileStorage._FileStorage__codec = codec
+        FileStorage._FileStorage__file_path = path
+        storage.save()
+        empty()
+        start = time.perf_counter()
+        storage.reload()
+        elapsed = time.perf_counter() - start
+        print("{:6}  {:8.1f} MB  reload {:7.2f}s".format(
+            codec, os.path.getsize(path) / 1e6, elapsed))
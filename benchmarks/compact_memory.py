@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""
+Reports the memory each file storage model takes per object, with the
+attributes in a dictionary per instance and in compact mode
+(HBNB_FILE_COMPACT=1), for objects loaded back from their to_dict().
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/compact_memory.py [objects per class]
+(defaults to 10000 objects per class)
+"""
+import os
+import subprocess
+import sys
+import tracemalloc
+
+samples = {
+    "Amenity": {"name": "Wifi"},
+    "State": {"name": "California"},
+    "City": {"name": "San Francisco", "state_id": "s" * 36},
+    "User": {"email": "betty@hbnb.io", "first_name": "Betty",
+             "last_name": "Holberton"},
+    "Place": {"name": "Loft", "city_id": "c" * 36, "user_id": "u" * 36,
+              "description": "Nice", "number_rooms": 3, "max_guest": 4,
+              "price_by_night": 120, "latitude": 37.7, "longitude": -122.4},
+    "Review": {"text": "Great stay", "place_id": "p" * 36,
+               "user_id": "u" * 36},
+}
+
+
+def measure(size):
+    """prints the bytes per object of each class"""
+    from models.engine.file_storage import classes
+    for name, attrs in samples.items():
+        records = [classes[name](**attrs).to_dict() for i in range(size)]
+        tracemalloc.start()
+        objs = [classes[name](**record) for record in records]
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print("{} {:.0f}".format(name, used / len(objs)))
+        del objs
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    if len(sys.argv) > 2:
+        measure(size)
+        sys.exit(0)
+    results = {}
+    for mode in ("0", "1"):
+        env = dict(os.environ, HBNB_FILE_COMPACT=mode)
+        out = subprocess.run([sys.executable, __file__, str(size), "child"],
+                             env=env, check=True, stdout=subprocess.PIPE,
+                             universal_newlines=True).stdout
+        for line in out.split("\n"):
+            if line:
+                name, used = line.split()
+                results.setdefault(name, []).append(int(used))
+    print("{} objects per class, bytes per object".format(size))
+    print("{:8} {:>8} {:>8} {:>7}".format("class", "dict", "compact",
+                                          "saved"))
+    for name, (before, after) in results.items():
+        print("{:8} {:8} {:8} {:6.0f}%".format(
+            name, before, after, 100 * (before - after) / before))
@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""
+Measures the latency of FileStorage.save() at each durability level, for
+a snapshot rewrite and for a journal append.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/durability.py [existing objects] [saves]
+(defaults to 10000 existing objects and 50 saves)
+"""
+import os
+import sys
+import tempfile
+import time
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+def run(level, journal, existing, saves):
+    """returns the mean seconds taken by one save of one changed user"""
+    FileStorage._FileStorage__durability = level
+    FileStorage._FileStorage__journal = journal
+    path = os.path.join(tempfile.mkdtemp(), "file.json")
+    FileStorage._FileStorage__file_path = path
+    FileStorage._FileStorage__journal_path = path + ".log"
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__classes = {}
+    storage = FileStorage()
+    users = [User(email="user{}@hbnb.io".format(i)) for i in range(existing)]
+    for user in users:
+        storage.new(user)
+    storage.save()
+    start = time.perf_counter()
+    for i in range(saves):
+        users[i].first_name = "Betty"
+        users[i].save()
+    return (time.perf_counter() - start) / saves
+
+
+if __name__ == "__main__":
+    existing = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    saves = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print("{} existing objects".format(existing))
+    for level in ("none", "file", "dir"):
+        print("{:5} snapshot {:9.3f}ms  journal {:9.3f}ms".format(
+            level, run(level, False, existing, saves) * 1000,
+            run(level, True, existing, saves) * 1000))
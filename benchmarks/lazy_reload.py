@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""
+Compares FileStorage.reload() building every object with lazy mode, which
+keeps the records and only builds the objects a request touches.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/lazy_reload.py [number of objects]
+(defaults to 100000 objects)
+"""
+import os
+import sys
+import tempfile
+import time
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+def fill(storage, size):
+    """adds size objects, a third each of users, places and reviews"""
+    for i in range(size // 3):
+        user = User(email="user{}@hbnb.io".format(i), first_name="Betty",
+                    last_name="Holberton")
+        place = Place(name="place{}".format(i), user_id=user.id,
+                      city_id="city", number_rooms=3, latitude=37.7)
+        review = Review(text="Great stay " * 5, user_id=user.id,
+                        place_id=place.id)
+        for obj in (user, place, review):
+            storage.new(obj)
+    return place.id
+
+
+def empty():
+    """forgets every object and record held by FileStorage"""
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__classes = {}
+    FileStorage._FileStorage__indexes = {}
+    FileStorage._FileStorage__records = {}
+    FileStorage._FileStorage__record_indexes = {}
+    FileStorage._FileStorage__versions = {}
+    FileStorage._FileStorage__signature = None
+
+
+def request(storage, place_id):
+    """reads a place, its owner and its reviews like GET /places/<id>"""
+    place = storage.get(Place, place_id)
+    storage.get(User, place.user_id)
+    return len(storage.related(Review, "place_id", place.id))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = os.path.join(tempfile.mkdtemp(), "file.json")
+    FileStorage._FileStorage__file_path = path
+    storage = FileStorage()
+    empty()
+    place_id = fill(storage, size)
+    storage.save()
+    print("{} objects".format(len(storage.all())))
+    for lazy in (False, True):
+        FileStorage._FileStorage__lazy = lazy
+        empty()
+        start = time.perf_counter()
+        storage.reload()
+        loaded = time.perf_counter() - start
+        request(storage, place_id)
+        served = time.perf_counter() - start - loaded
+        built = len(FileStorage._FileStorage__objects)
+        print("{:6}  reload {:6.2f}s  first request {:8.3f}ms  "
+              "{} objects built".format("lazy" if lazy else "eager", loaded,
+                                        served * 1000, built))
+    os.remove(path)
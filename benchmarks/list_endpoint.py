@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""
+Compares GET /api/v1/users answered by jsonify() of a list of to_dict()
+dictionaries with the list joined from the JSON fragments the users
+cache, measuring latency and peak memory.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/list_endpoint.py [number of users]
+(defaults to 100000 users)
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def measure(label, request):
+    """prints the latency and peak memory of request()"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = len(request())
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print("{:22} {:8.1f}ms  peak {:7.1f} MB  body {:.1f} MB".format(
+        label, elapsed * 1000, peak / 1e6, size / 1e6))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    os.chdir(tempfile.mkdtemp())
+    from flask import jsonify
+    from api.v1.app import app
+    from models import storage
+    from models.user import User
+    for i in range(size):
+        storage.new(User(email="user{}@hbnb.io".format(i),
+                         first_name="Betty", last_name="Holberton"))
+    client = app.test_client()
+
+    def old():
+        """the endpoint as it was, jsonify() of the to_dict() list"""
+        with app.test_request_context():
+            users = [user.to_dict() for user in storage.all(User).values()]
+            return jsonify(users).get_data()
+
+    def new():
+        """the endpoint, joining the cached fragments"""
+        return client.get("/api/v1/users").get_data()
+
+    print("{} users".format(size))
+    measure("jsonify", old)
+    measure("fragments, first", new)
+    measure("jsonify, cached dicts", old)
+    measure("fragments, cached", new)
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+"""
+Compares the place search of FileStorage walking the relationships (as
+/places_search did) with the indexed search of models.engine.search.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/places_search.py [states cities places]
+(defaults to 500 states, 20000 cities and 1000000 places, with 50
+amenities, 3 per place)
+"""
+import random
+import sys
+import time
+from models import storage
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+
+
+def fill(n_states, n_cities, n_places):
+    """adds the states, cities, amenities and places"""
+    states = [State(name="state{}".format(i)) for i in range(n_states)]
+    cities = [City(name="city{}".format(i),
+                   state_id=states[i % n_states].id)
+              for i in range(n_cities)]
+    amenities = [Amenity(name="amenity{}".format(i)) for i in range(50)]
+    for obj in states + cities + amenities:
+        storage.new(obj)
+    rand = random.Random(0)
+    for i in range(n_places):
+        ids = [a.id for a in rand.sample(amenities, 3)]
+        storage.new(Place(name="place{}".format(i), user_id="user",
+                          city_id=cities[i % n_cities].id, amenity_ids=ids))
+    return states, cities, amenities
+
+
+def walk(states, cities, amenities):
+    """the search as /places_search did it before the indexes"""
+    list_places = []
+    for state in [storage.get(State, s_id) for s_id in states]:
+        if state:
+            for city in state.cities:
+                for place in city.places:
+                    list_places.append(place)
+    for city in [storage.get(City, c_id) for c_id in cities]:
+        if city:
+            for place in city.places:
+                if place not in list_places:
+                    list_places.append(place)
+    if amenities:
+        if not list_places:
+            list_places = storage.all(Place).values()
+        amenities_obj = [storage.get(Amenity, a_id) for a_id in amenities]
+        list_places = [place for place in list_places
+                       if all([am in place.amenities
+                               for am in amenities_obj])]
+    return list_places
+
+
+def timed(function, *args):
+    """returns the result of function and the seconds it took"""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:4]] or [500, 20000, 1000000]
+    states, cities, amenities = fill(*sizes)
+    print("{} states, {} cities, {} places".format(*sizes))
+    queries = [
+        ("10 states", [s.id for s in states[:10]], [], []),
+        ("100 cities", [], [c.id for c in cities[:100]], []),
+        ("1 state, 2 amenities", [states[0].id], [],
+         [a.id for a in amenities[:2]]),
+        ("2 amenities", [], [], [a.id for a in amenities[:2]]),
+    ]
+    for label, *args in queries:
+        old, old_time = timed(walk, *args)
+        new, new_time = timed(storage.search_places, *args)
+        assert set(old) == set(new)
+        print("{:22} {:6} places  walk {:9.1f}ms  indexed {:8.1f}ms".format(
+            label, len(new), old_time * 1000, new_time * 1000))
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""
+Load test of the DBStorage connection pool: threads standing for Flask
+workers each run requests that look an object up, count a table and hold
+their connection a few milliseconds before closing the session, and the
+request latency percentiles are printed for several pool sizes with the
+pool statistics.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/pool_load.py [threads] [requests per thread]
+(defaults to 32 threads of 50 requests; HBNB_DB_URL or the HBNB_MYSQL_*
+variables select the database, a temporary SQLite file otherwise)
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# (HBNB_MYSQL_POOL_SIZE, HBNB_MYSQL_MAX_OVERFLOW) of each run
+pools = [(1, 0), (5, 0), (5, 10), (20, 10)]
+
+# seconds a request keeps its connection after its queries
+hold = 0.005
+
+
+def percentile(values, rank):
+    """returns the rank percentile of the sorted list values"""
+    return values[min(len(values) - 1, int(len(values) * rank / 100))]
+
+
+def run(storage, state_id, threads, requests):
+    """returns the sorted latencies of threads x requests requests"""
+    from models.state import State
+    latencies = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def worker():
+        """runs requests requests, noting their latencies"""
+        mine = []
+        start.wait()
+        for i in range(requests):
+            begin = time.perf_counter()
+            storage.get(State, state_id)
+            storage.count(State)
+            time.sleep(hold)
+            storage.close()
+            mine.append(time.perf_counter() - begin)
+        with lock:
+            latencies.extend(mine)
+
+    workers = [threading.Thread(target=worker) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return sorted(latencies)
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    os.environ["HBNB_TYPE_STORAGE"] = "db"
+    os.environ.pop("HBNB_ENV", None)
+    if "HBNB_DB_URL" not in os.environ and \
+            "HBNB_MYSQL_HOST" not in os.environ:
+        os.environ["HBNB_DB_URL"] = "sqlite:///" + os.path.join(
+            tempfile.mkdtemp(), "hbnb.db")
+    import models
+    from models.engine.db_storage import DBStorage
+    from models.state import State
+    state = State(name="California")
+    models.storage.new(state)
+    models.storage.save()
+    print("{} threads x {} requests, {:.0f}ms held per request".format(
+        threads, requests, hold * 1000))
+    for size, overflow in pools:
+        os.environ["HBNB_MYSQL_POOL_SIZE"] = str(size)
+        os.environ["HBNB_MYSQL_MAX_OVERFLOW"] = str(overflow)
+        storage = DBStorage()
+        storage.reload()
+        latencies = run(storage, state.id, threads, requests)
+        stats = storage.pool_stats()
+        print("pool {:2} + {:2}  p50 {:7.1f}ms  p95 {:7.1f}ms  "
+              "p99 {:7.1f}ms  max {:7.1f}ms  wait max {:7.1f}ms  "
+              "timeouts {}".format(
+                  size, overflow,
+                  *(percentile(latencies, rank) * 1000
+                    for rank in (50, 95, 99, 100)),
+                  stats["wait_max"] * 1000, stats["timeouts"]))
+        storage._DBStorage__engine.dispose()
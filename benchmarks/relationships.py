@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""
+Compares State.cities lookups done by scanning every City in FileStorage
+with lookups through the storage foreign key index.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/relationships.py [number of cities ...]
+(defaults to 10000 100000 1000000)
+"""
+import sys
+import time
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.state import State
+
+STATES = 100
+LOOKUPS = 200
+
+
+def scan(storage, state):
+    """the lookup State.cities used before the foreign key index"""
+    return [city for city in storage.all(City).values()
+            if city.state_id == state.id]
+
+
+def run(size):
+    """fills a fresh storage with size cities and times both lookups"""
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__classes = {}
+    FileStorage._FileStorage__indexes = {}
+    storage = FileStorage()
+    states = [State(name="state{}".format(i)) for i in range(STATES)]
+    for state in states:
+        storage.new(state)
+    for i in range(size):
+        storage.new(City(name="city{}".format(i),
+                         state_id=states[i % STATES].id))
+    timings = []
+    for lookup in (scan, lambda s, st: s.related(City, "state_id", st.id)):
+        start = time.perf_counter()
+        for i in range(LOOKUPS):
+            lookup(storage, states[i % STATES])
+        timings.append((time.perf_counter() - start) / LOOKUPS)
+    print("{:>9} cities  scan {:10.6f}s  index {:10.6f}s  x{:.0f}".format(
+        size, timings[0], timings[1], timings[0] / timings[1]))
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:] or ["10000", "100000", "1000000"]:
+        run(int(arg))
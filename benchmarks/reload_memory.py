@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""
+Measures the peak memory FileStorage.reload() allocates to load file.json,
+comparing the streaming reader with reading the whole document through
+json.load() first.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/reload_memory.py [number of objects]
+(defaults to 100000 objects)
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from models.user import User
+
+
+def fill(storage, size):
+    """adds size objects, a third each of users, places and reviews"""
+    for i in range(size // 3):
+        user = User(email="user{}@hbnb.io".format(i), first_name="Betty",
+                    last_name="Holberton")
+        place = Place(name="place{}".format(i), user_id=user.id,
+                      city_id="city", number_rooms=3, latitude=37.7)
+        review = Review(text="Great stay " * 5, user_id=user.id,
+                        place_id=place.id)
+        for obj in (user, place, review):
+            storage.new(obj)
+
+
+def empty():
+    """forgets every object held by FileStorage"""
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__classes = {}
+    FileStorage._FileStorage__indexes = {}
+    FileStorage._FileStorage__versions = {}
+    FileStorage._FileStorage__signature = None
+
+
+def load_whole(storage, path):
+    """loads path the way reload() did before streaming"""
+    with open(path, "r") as f:
+        records = json.load(f)
+    for key, record in records.items():
+        storage._FileStorage__merge(key, record)
+
+
+def measure(load):
+    """returns the peak memory in MB and the seconds load() takes"""
+    empty()
+    tracemalloc.start()
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1e6, elapsed
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = os.path.join(tempfile.mkdtemp(), "file.json")
+    FileStorage._FileStorage__codec = "json"
+    FileStorage._FileStorage__file_path = path
+    storage = FileStorage()
+    empty()
+    fill(storage, size)
+    storage.save()
+    print("{} objects, file.json {:.1f} MB".format(
+        len(storage.all()), os.path.getsize(path) / 1e6))
+    for name, load in (("json.load", lambda: load_whole(storage, path)),
+                       ("streaming", storage.reload)):
+        peak, elapsed = measure(load)
+        print("{:10} peak {:8.1f} MB  {:6.2f}s".format(name, peak, elapsed))
+    os.remove(path)
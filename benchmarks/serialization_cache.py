@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+"""
+Measures to_dict() and to_json() on unchanged objects, the first call
+serializing them and the next ones answered by the serialization cache.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/serialization_cache.py [number of objects]
+(defaults to 100000 objects)
+"""
+import sys
+import time
+from models.base_model import cache_stats
+from models.user import User
+
+
+def run(label, objs, method):
+    """prints the time method takes over every object"""
+    start = time.perf_counter()
+    for obj in objs:
+        method(obj)
+    elapsed = time.perf_counter() - start
+    print("{:16} {:7.3f}s  {:6.2f}us each".format(
+        label, elapsed, elapsed * 1e6 / len(objs)))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    users = [User(email="user{}@hbnb.io".format(i), first_name="Betty",
+                  last_name="Holberton") for i in range(size)]
+    print("{} users".format(size))
+    run("to_dict first", users, User.to_dict)
+    run("to_dict cached", users, User.to_dict)
+    run("to_json first", users, User.to_json)
+    run("to_json cached", users, User.to_json)
+    for user in users:
+        user.first_name = "Bob"
+    run("to_json changed", users, User.to_json)
+    print("hits {hits} misses {misses}".format(**cache_stats))
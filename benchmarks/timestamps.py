@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+"""
+Compares strptime/strftime with the parse_time/format_time fast path of
+BaseModel on timestamps in the time format.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/timestamps.py [number of timestamps]
+(defaults to 1000000 timestamps)
+"""
+from datetime import datetime, timedelta
+import sys
+import time
+from models.base_model import format_time, parse_time
+from models.base_model import time as t_format
+
+
+def run(label, function, values):
+    """prints the time function takes over every value"""
+    start = time.perf_counter()
+    for value in values:
+        function(value)
+    elapsed = time.perf_counter() - start
+    print("{:22} {:6.2f}s  {:6.2f}us each".format(
+        label, elapsed, elapsed * 1e6 / len(values)))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    start = datetime(2017, 6, 14, 22, 31, 3, 285259)
+    dates = [start + timedelta(seconds=i, microseconds=i)
+             for i in range(size)]
+    strings = [date.strftime(t_format) for date in dates]
+    print("{} timestamps".format(size))
+    run("strptime", lambda value: datetime.strptime(value, t_format),
+        strings)
+    run("parse_time", parse_time, strings)
+    run("strftime", lambda value: value.strftime(t_format), dates)
+    run("format_time", format_time, dates)
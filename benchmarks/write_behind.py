@@ -0,0 +1,43 @@
+#!/usr/bin/python3
+"""
+Reports how many User.save() calls per second FileStorage sustains in the
+synchronous and the write-behind modes, on top of existing objects.
+
+Usage (from the repository root):
+    PYTHONPATH=. ./benchmarks/write_behind.py [existing objects] [saves]
+(defaults to 10000 existing objects and 2000 saves)
+"""
+import os
+import sys
+import tempfile
+import time
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+def run(mode, existing, saves):
+    """returns the saves per second in mode, final flush included"""
+    FileStorage._FileStorage__file_path = os.path.join(tempfile.mkdtemp(),
+                                                       "file.json")
+    FileStorage._FileStorage__objects = {}
+    FileStorage._FileStorage__classes = {}
+    FileStorage._FileStorage__write_mode = mode
+    storage = FileStorage()
+    for i in range(existing):
+        storage.new(User(email="user{}@hbnb.io".format(i)))
+    storage.save()
+    storage.flush()
+    start = time.perf_counter()
+    for i in range(saves):
+        User(email="new{}@hbnb.io".format(i)).save()
+    storage.flush()
+    return saves / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    existing = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    saves = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    print("{} existing objects".format(existing))
+    print("sync    {:10.1f} writes/s".format(
+        run("sync", existing, max(saves // 20, 1))))
+    print("behind  {:10.1f} writes/s".format(run("behind", existing, saves)))
@@ -54,6 +54,13 @@ class HBNBCommand(cmd.Cmd):
                 new_dict[key] = value
         return new_dict
 
+    def _get(self, name, id):
+        """returns the instance of class name with id, or None"""
+        obj = models.storage.get(classes[name], id)
+        if isinstance(obj, classes[name]):
+            return obj
+        return None
+
     def do_create(self, arg):
         """Creates a new instance of a class"""
         args = arg.split()
@@ -77,9 +84,9 @@ class HBNBCommand(cmd.Cmd):
             return False
         if args[0] in classes:
             if len(args) > 1:
-                key = args[0] + "." + args[1]
-                if key in models.storage.all():
-                    print(models.storage.all()[key])
+                obj = self._get(args[0], args[1])
+                if obj is not None:
+                    print(obj)
                 else:
                     print("** no instance found **")
             else:
@@ -94,10 +101,9 @@ class HBNBCommand(cmd.Cmd):
             print("** class name missing **")
         elif args[0] in classes:
             if len(args) > 1:
-                key = args[0] + "." + args[1]
-                if key in models.storage.all():
-                    models.storage.all().pop(key)
-                    models.storage.save()
+                obj = self._get(args[0], args[1])
+                if obj is not None:
+                    models.storage.delete(obj)
                 else:
                     print("** no instance found **")
             else:
@@ -108,18 +114,18 @@ class HBNBCommand(cmd.Cmd):
     def do_all(self, arg):
         """Prints string representations of instances"""
         args = shlex.split(arg)
-        obj_list = []
         if len(args) == 0:
-            obj_dict = models.storage.all()
+            objs = models.storage.iter_all()
         elif args[0] in classes:
-            obj_dict = models.storage.all(classes[args[0]])
+            objs = models.storage.iter_all(classes[args[0]])
         else:
             print("** class doesn't exist **")
             return False
-        for key in obj_dict:
-            obj_list.append(str(obj_dict[key]))
         print("[", end="")
-        print(", ".join(obj_list), end="")
+        sep = ""
+        for obj in objs:
+            print(sep + str(obj), end="")
+            sep = ", "
         print("]")
 
     def do_update(self, arg):
@@ -132,8 +138,8 @@ class HBNBCommand(cmd.Cmd):
             print("** class name missing **")
         elif args[0] in classes:
             if len(args) > 1:
-                k = args[0] + "." + args[1]
-                if k in models.storage.all():
+                obj = self._get(args[0], args[1])
+                if obj is not None:
                     if len(args) > 2:
                         if len(args) > 3:
                             if args[0] == "Place":
@@ -147,8 +153,8 @@ class HBNBCommand(cmd.Cmd):
                                         args[3] = float(args[3])
                                     except Exception:
                                         args[3] = 0.0
-                            setattr(models.storage.all()[k], args[2], args[3])
-                            models.storage.all()[k].save()
+                            setattr(obj, args[2], args[3])
+                            obj.save()
                         else:
                             print("** value missing **")
                     else:
@@ -3,30 +3,222 @@
 Contains class BaseModel
 """
 
+from collections.abc import MutableMapping
 from datetime import datetime
+import json
 import models
 from os import getenv
 import sqlalchemy
-from sqlalchemy import Column, String, DateTime
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy.ext.declarative import declarative_base, declared_attr
+from sqlalchemy.orm import ColumnProperty
+from sqlalchemy.orm.attributes import QueryableAttribute
 import uuid
 import hashlib
 
 time = "%Y-%m-%dT%H:%M:%S.%f"
 
+# dictionary - lookups of the serialization cache of file storage models
+# answered from the cache ("hits") or by serializing again ("misses")
+cache_stats = {"hits": 0, "misses": 0}
+
+
+def encode(record):
+    """returns record encoded as JSON bytes the way flask.jsonify does"""
+    return json.dumps(record, sort_keys=True,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def parse_time(value):
+    """returns the datetime of a string in the time format. The fixed
+    26 character form is read by datetime.fromisoformat, anything else
+    (fewer fraction digits, time zones, malformed values) goes through
+    strptime"""
+    if len(value) == 26 and value[10] == "T" and value[19] == "." and \
+            value[4] == value[7] == "-" and value[13] == value[16] == ":" \
+            and value[20:].isdigit():
+        return datetime.fromisoformat(value)
+    return datetime.strptime(value, time)
+
+
+def format_time(value):
+    """returns the datetime value as a string in the time format"""
+    if value.tzinfo is None and value.year >= 1000:
+        if value.microsecond:
+            return value.isoformat()
+        return value.isoformat() + ".000000"
+    return value.strftime(time)
+
+
+def attributes(cls):
+    """returns the set of the names of the attributes the instances of
+    the model class cls store and storage may set: id, the timestamps,
+    the attributes with a default value or a column, and the properties
+    with a setter (e.g. User.password)"""
+    names = {"id", "created_at", "updated_at"}
+    names.update(getattr(cls, "_defaults", ()))
+    for klass in cls.__mro__:
+        for name, value in vars(klass).items():
+            if name[0] == "_":
+                continue
+            if isinstance(value, property):
+                if value.fset is not None:
+                    names.add(name)
+            elif type(value) in (str, int, float, list, type(None)):
+                names.add(name)
+            elif isinstance(value, QueryableAttribute) and \
+                    isinstance(value.property, ColumnProperty):
+                names.add(name)
+    return names
+
+
 if models.storage_t == "db":
     Base = declarative_base()
 else:
     Base = object
 
+# bool - file storage models keep their attributes in __slots__ rather
+# than in a dictionary per instance
+compact = models.storage_t != "db" and getenv("HBNB_FILE_COMPACT") == "1"
+
+
+class Compact(type):
+    """Metaclass of the models in compact mode. The attributes a class body
+    gives a plain default value become slots, and the default is returned
+    while an instance has not set its own value"""
+    def __new__(mcs, name, bases, namespace):
+        """turns the plain class attributes of namespace into slots"""
+        defaults = {}
+        fields = []
+        for base in reversed(bases):
+            defaults.update(getattr(base, "_defaults", {}))
+            fields.extend(getattr(base, "_fields", ()))
+        own = [attr for attr, value in namespace.items()
+               if attr[0] != "_" and
+               type(value) in (str, int, float, list, type(None))]
+        for attr in own:
+            defaults[attr] = namespace.pop(attr)
+        slots = tuple(namespace.get("__slots__", ()))
+        fields.extend(slot for slot in slots if slot[0] != "_")
+        fields.extend(own)
+        namespace["__slots__"] = slots + tuple(own)
+        namespace["_defaults"] = defaults
+        namespace["_fields"] = tuple(fields)
+        return super().__new__(mcs, name, bases, namespace)
+
+
+class Attributes(MutableMapping):
+    """Dictionary view of the attributes set on an instance in compact
+    mode, the slots it set then the attributes without a slot"""
+    __slots__ = ("obj",)
+
+    def __init__(self, obj):
+        """views the attributes of obj"""
+        self.obj = obj
+
+    def extra(self, create=False):
+        """returns the dictionary of the attributes without a slot"""
+        try:
+            return object.__getattribute__(self.obj, "_extra")
+        except AttributeError:
+            if not create:
+                return {}
+            extra = {}
+            object.__setattr__(self.obj, "_extra", extra)
+            return extra
+
+    def __getitem__(self, name):
+        """returns the value of the attribute name"""
+        if name in type(self.obj)._fields:
+            try:
+                return object.__getattribute__(self.obj, name)
+            except AttributeError:
+                raise KeyError(name)
+        return self.extra()[name]
+
+    def __setitem__(self, name, value):
+        """sets the attribute name"""
+        if name in type(self.obj)._fields:
+            object.__setattr__(self.obj, name, value)
+        else:
+            self.extra(True)[name] = value
+
+    def __delitem__(self, name):
+        """unsets the attribute name"""
+        if name in type(self.obj)._fields:
+            try:
+                object.__delattr__(self.obj, name)
+            except AttributeError:
+                raise KeyError(name)
+        else:
+            del self.extra()[name]
+
+    def __iter__(self):
+        """iterates over the names of the attributes set"""
+        for name in type(self.obj)._fields:
+            try:
+                object.__getattribute__(self.obj, name)
+            except AttributeError:
+                continue
+            yield name
+        yield from self.extra()
+
+    def __len__(self):
+        """returns the number of attributes set"""
+        return sum(1 for name in self)
 
-class BaseModel:
+    def copy(self):
+        """returns the attributes as a new dictionary"""
+        return dict(self)
+
+    def __repr__(self):
+        """prints the attributes as a dictionary"""
+        return repr(dict(self))
+
+
+class BaseModel(metaclass=Compact if compact else type):
     """The BaseModel class from which future classes will be derived"""
     if models.storage_t == "db":
         id = Column(String(60), primary_key=True)
         created_at = Column(DateTime, default=datetime.utcnow)
         updated_at = Column(DateTime, default=datetime.utcnow)
 
+        @declared_attr
+        def __table_args__(cls):
+            """index of the (created_at, id) order of the pages of the
+            table"""
+            return (Index("ix_{}_created_at_id".format(cls.__tablename__),
+                          "created_at", "id"),)
+    elif compact:
+        # _extra - dictionary of the attributes without a slot, created
+        # when the first one is set
+        __slots__ = ("__weakref__", "_dirty", "_cache", "_extra", "id",
+                     "created_at", "updated_at")
+
+        @property
+        def __dict__(self):
+            """live dictionary view of the attributes set on the instance"""
+            return Attributes(self)
+
+        def __getattr__(self, name):
+            """returns the attribute without a slot name, or the class
+            default of a slot not set yet"""
+            if name != "_extra":
+                try:
+                    return self._extra[name]
+                except (AttributeError, KeyError):
+                    pass
+                if name in self._defaults:
+                    return self._defaults[name]
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                self.__class__.__name__, name))
+    else:
+        # _dirty - True while the object changed since file storage last
+        # serialized it, kept out of __dict__ and so out of to_dict()
+        # _cache - (to_dict() output, its JSON bytes or None) until the
+        # object changes
+        __slots__ = ("__dict__", "__weakref__", "_dirty", "_cache")
+
     def __init__(self, *args, **kwargs):
         """Initialization of the base model"""
         if kwargs:
@@ -34,12 +226,12 @@ class BaseModel:
                 if key != "__class__":
                     setattr(self, key, value)
             if kwargs.get("created_at", None) and type(self.created_at) is str:
-                self.created_at = datetime.strptime(kwargs["created_at"], time)
-            else:
+                self.created_at = parse_time(kwargs["created_at"])
+            elif type(kwargs.get("created_at", None)) is not datetime:
                 self.created_at = datetime.now()
             if kwargs.get("updated_at", None) and type(self.updated_at) is str:
-                self.updated_at = datetime.strptime(kwargs["updated_at"], time)
-            else:
+                self.updated_at = parse_time(kwargs["updated_at"])
+            elif type(kwargs.get("updated_at", None)) is not datetime:
                 self.updated_at = datetime.now()
             if kwargs.get("id", None) is None:
                 self.id = str(uuid.uuid4())
@@ -48,6 +240,21 @@ class BaseModel:
             self.created_at = datetime.now()
             self.updated_at = self.created_at
 
+    def __setattr__(self, name, value):
+        """sets an attribute, marking the object dirty, dropping its cached
+        serialization and keeping the file storage indexes current"""
+        old = getattr(self, name, None) if models.storage_t != "db" else None
+        if compact and not hasattr(type(self), name):
+            self.__dict__[name] = value
+        else:
+            super().__setattr__(name, value)
+        if models.storage_t != "db" and name != "_dirty":
+            super().__setattr__("_dirty", True)
+            super().__setattr__("_cache", None)
+            if name[-3:] == "_id" or name[-4:] == "_ids" or \
+                    name == "created_at":
+                models.storage.update_index(self, name, old)
+
     def __str__(self):
         """String representation of the BaseModel class"""
         return "[{:s}] ({:s}) {}".format(self.__class__.__name__, self.id,
@@ -61,11 +268,41 @@ class BaseModel:
 
     def to_dict(self):
         """returns a dictionary containing all keys/values of the instance"""
+        if models.storage_t != "db":
+            return dict(self.__cached(False)[0])
+        return self.__to_dict()
+
+    def to_json(self):
+        """returns the to_dict() output encoded as JSON bytes"""
+        if models.storage_t != "db":
+            return self.__cached(True)[1]
+        return encode(self.__to_dict())
+
+    def _record(self):
+        """returns the cached to_dict() output itself rather than a copy,
+        for file storage to write; it must not be changed"""
+        return self.__cached(False)[0]
+
+    def __cached(self, encoded):
+        """returns the cached (to_dict() output, JSON bytes) of the
+        instance, serializing it again only if it changed since"""
+        cache = getattr(self, "_cache", None)
+        if cache is None or (encoded and cache[1] is None):
+            cache_stats["misses"] += 1
+            record = self.__to_dict() if cache is None else cache[0]
+            cache = (record, encode(record) if encoded else None)
+            object.__setattr__(self, "_cache", cache)
+        else:
+            cache_stats["hits"] += 1
+        return cache
+
+    def __to_dict(self):
+        """serializes the instance for to_dict()"""
         new_dict = self.__dict__.copy()
         if "created_at" in new_dict:
-            new_dict["created_at"] = new_dict["created_at"].strftime(time)
+            new_dict["created_at"] = format_time(new_dict["created_at"])
         if "updated_at" in new_dict:
-            new_dict["updated_at"] = new_dict["updated_at"].strftime(time)
+            new_dict["updated_at"] = format_time(new_dict["updated_at"])
         new_dict["__class__"] = self.__class__.__name__
         if "_sa_instance_state" in new_dict:
             del new_dict["_sa_instance_state"]
@@ -32,6 +32,4 @@ class City(BaseModel, Base):
         @property
         def places(self):
             """Returns all places in a city"""
-            all_places = models.storage.all(Place).values()
-            res = [place for place in all_places if place.id == self.id]
-            return res
+            return models.storage.related(Place, "city_id", self.id)
@@ -0,0 +1,208 @@
+#!/usr/bin/python3
+"""
+Contains the compact binary snapshot format of FileStorage
+
+A snapshot holds the records of each class as columns: every attribute of
+the class is stored once with all its values, strings as a table of
+lengths followed by their UTF-8 text, integers, floats and timestamps as
+arrays of 8 byte numbers, anything else as a JSON array. Timestamps are
+microseconds since the epoch and load back as datetime objects. Lone
+surrogates, which JSON strings may hold, are kept as their UTF-8 bytes.
+
+Converts a JSON snapshot to binary and back when run as a script:
+    python3 -m models.engine.binary_codec to-binary file.json file.bin
+    python3 -m models.engine.binary_codec to-json file.bin file.json
+"""
+
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate
+import json
+import struct
+import sys
+from models.base_model import format_time, parse_time
+
+MAGIC = b"HBNB\x01"
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+# attributes stored as timestamps when every value is one
+timestamps = ("created_at", "updated_at")
+
+_u16 = struct.Struct("<H")
+_u32 = struct.Struct("<I")
+_u64 = struct.Struct("<Q")
+_MISSING = object()
+
+
+def dump(records, f):
+    """writes the dictionary records (<class name>.id -> to_dict() output)
+    to the binary file object f"""
+    by_class = {}
+    for record in records.values():
+        by_class.setdefault(record["__class__"], []).append(record)
+    f.write(MAGIC)
+    f.write(_u32.pack(len(by_class)))
+    for name, rows in by_class.items():
+        names = []
+        for row in rows:
+            for attr in row:
+                if attr != "__class__" and attr not in names:
+                    names.append(attr)
+        _write_str(f, name)
+        f.write(_u32.pack(len(rows)))
+        f.write(_u16.pack(len(names)))
+        for attr in names:
+            column = [row.get(attr, _MISSING) for row in rows]
+            present = [value for value in column if value is not _MISSING]
+            kind, payload = _encode(attr, present)
+            _write_str(f, attr)
+            f.write(kind)
+            if len(present) == len(column):
+                f.write(b"\x00")
+            else:
+                f.write(b"\x01")
+                f.write(bytes(value is not _MISSING for value in column))
+            f.write(_u64.pack(len(payload)))
+            f.write(payload)
+
+
+def load(f):
+    """returns the dictionary of records read from the binary file object
+    f, with datetime objects for the timestamps"""
+    return dict(iter_records(f))
+
+
+def iter_records(f):
+    """yields the (<class name>.id, record) pairs of the binary file object
+    f, building the records of a class one at a time from its columns"""
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError("not a binary snapshot")
+    for i in range(_read(f, _u32)):
+        name = _read_str(f)
+        count = _read(f, _u32)
+        names = []
+        columns = []
+        for j in range(_read(f, _u16)):
+            names.append(_read_str(f))
+            kind = f.read(1)
+            mask = f.read(count) if f.read(1) == b"\x01" else None
+            values = _decode(kind, f.read(_read(f, _u64)))
+            if mask is not None:
+                values = iter(values)
+                values = [next(values) if flag else _MISSING
+                          for flag in mask]
+            columns.append(values)
+        names.append("__class__")
+        columns.append([name] * count)
+        for row in zip(*columns):
+            record = dict(zip(names, row))
+            if _MISSING in row:
+                record = {key: value for key, value in record.items()
+                          if value is not _MISSING}
+            yield name + "." + record["id"], record
+
+
+def _encode(attr, values):
+    """returns the type code and the payload of a column of values"""
+    types = set(type(value) for value in values)
+    if attr in timestamps and types <= {str, datetime}:
+        try:
+            micros = [_micros(value) for value in values]
+        except ValueError:
+            micros = None
+        if micros is not None:
+            return b"t", _array("q", micros)
+    if types == {str}:
+        lengths = _array("I", [len(value) for value in values])
+        text = "".join(values).encode("utf-8", "surrogatepass")
+        return b"s", _u32.pack(len(lengths)) + lengths + text
+    if types == {int} and all(-2 ** 63 <= v < 2 ** 63 for v in values):
+        return b"i", _array("q", values)
+    if types == {float}:
+        return b"d", _array("d", values)
+    return b"j", json.dumps(values, separators=(",", ":"),
+                            default=str).encode("utf-8")
+
+
+def _decode(kind, payload):
+    """returns the list of values of a column from its payload"""
+    if kind == b"s":
+        size = _u32.unpack_from(payload)[0] + 4
+        lengths = _read_array("I", payload[4:size])
+        text = payload[size:].decode("utf-8", "surrogatepass")
+        ends = list(accumulate(lengths))
+        return [text[end - length:end]
+                for end, length in zip(ends, lengths)]
+    if kind == b"t":
+        return [EPOCH + micros * MICROSECOND
+                for micros in _read_array("q", payload)]
+    if kind == b"i":
+        return _read_array("q", payload).tolist()
+    if kind == b"d":
+        return _read_array("d", payload).tolist()
+    return json.loads(payload.decode("utf-8"))
+
+
+def _micros(value):
+    """returns the microseconds between the epoch and a datetime, or a
+    string in the BaseModel time format"""
+    if type(value) is str:
+        value = parse_time(value)
+    return (value - EPOCH) // MICROSECOND
+
+
+def _array(typecode, values):
+    """returns values packed as a little-endian array of typecode"""
+    packed = array(typecode, values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _read_array(typecode, payload):
+    """returns the array of typecode packed in payload by _array"""
+    packed = array(typecode)
+    packed.frombytes(payload)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed
+
+
+def _write_str(f, value):
+    """writes a short string prefixed by its length in bytes"""
+    data = value.encode("utf-8", "surrogatepass")
+    f.write(_u16.pack(len(data)))
+    f.write(data)
+
+
+def _read_str(f):
+    """reads a string written by _write_str"""
+    return f.read(_read(f, _u16)).decode("utf-8", "surrogatepass")
+
+
+def _read(f, number):
+    """reads one number of the struct format number"""
+    return number.unpack(f.read(number.size))[0]
+
+
+def convert(src, dst, to_binary=True):
+    """converts the JSON snapshot src to the binary snapshot dst, or the
+    other way around"""
+    if to_binary:
+        with open(src, "r") as f:
+            records = json.load(f)
+        with open(dst, "wb") as f:
+            dump(records, f)
+    else:
+        with open(src, "rb") as f:
+            records = load(f)
+        with open(dst, "w") as f:
+            json.dump(records, f, indent=4,
+                      default=format_time)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("to-binary", "to-json"):
+        print("Usage: {} to-binary|to-json SRC DST".format(sys.argv[0]))
+        sys.exit(1)
+    convert(sys.argv[2], sys.argv[3], sys.argv[1] == "to-binary")
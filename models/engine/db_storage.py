@@ -3,9 +3,11 @@
 Contains the class DBStorage
 """
 
+from collections import OrderedDict
+from datetime import datetime
 import models
 from models.amenity import Amenity
-from models.base_model import BaseModel, Base
+from models.base_model import BaseModel, Base, attributes
 from models.city import City
 from models.place import Place
 from models.review import Review
@@ -13,17 +15,72 @@ from models.state import State
 from models.user import User
 from os import getenv
 import sqlalchemy
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy import and_, create_engine, event, exc, func, literal, or_
+from sqlalchemy import bindparam, select, union_all
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import joinedload, selectinload, subqueryload
+from sqlalchemy.orm import make_transient_to_detached, scoped_session
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.pool import QueuePool
+from threading import Lock
+from time import monotonic
 
 classes = {"Amenity": Amenity, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+# relationship loading strategies usable for eager loading
+loaders = {"selectin": selectinload, "joined": joinedload,
+           "subquery": subqueryload}
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool keeping the number of checkouts, of checkouts that timed
+    out and the time spent waiting for a connection"""
+    def __init__(self, *args, **kwargs):
+        """Instantiate the pool with its counters at 0"""
+        super().__init__(*args, **kwargs)
+        self.stats_lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        """returns a connection, timing the wait for it"""
+        start = monotonic()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self.stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            wait = monotonic() - start
+            with self.stats_lock:
+                self.checkouts += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+
 
 class DBStorage:
     """interaacts with the MySQL database"""
     __engine = None
     __session = None
+    # (monotonic time, counts()) of the last counts() query, reused for
+    # __counts_ttl seconds
+    __counts = None
+    __counts_ttl = 0
+    # OrderedDict - detached copies of the objects get() loaded, by
+    # <class name>.id key, least recently used first, holding at most
+    # __cache_size of them (0 disables the cache)
+    __cache = None
+    __cache_size = 0
+    __cache_lock = None
+    # int - number of commits that changed objects, a copy loaded while it
+    # changed may be stale and is not cached
+    __version = 0
 
     def __init__(self):
         """Instantiate a DBStorage object"""
@@ -32,25 +89,67 @@ class DBStorage:
         HBNB_MYSQL_HOST = getenv('HBNB_MYSQL_HOST')
         HBNB_MYSQL_DB = getenv('HBNB_MYSQL_DB')
         HBNB_ENV = getenv('HBNB_ENV')
-        self.__engine = create_engine('mysql+mysqldb://{}:{}@{}/{}'.
-                                      format(HBNB_MYSQL_USER,
-                                             HBNB_MYSQL_PWD,
-                                             HBNB_MYSQL_HOST,
-                                             HBNB_MYSQL_DB))
+        # HBNB_DB_URL - any SQLAlchemy database URL used instead of the
+        # MySQL one, e.g. sqlite:///hbnb.db to run the tests locally
+        HBNB_DB_URL = getenv('HBNB_DB_URL')
+        if HBNB_DB_URL is None:
+            HBNB_DB_URL = 'mysql+mysqldb://{}:{}@{}/{}'.format(
+                HBNB_MYSQL_USER, HBNB_MYSQL_PWD, HBNB_MYSQL_HOST,
+                HBNB_MYSQL_DB)
+        # HBNB_MYSQL_POOL_SIZE, HBNB_MYSQL_MAX_OVERFLOW - connections kept
+        # open, and opened on top of them under load; HBNB_MYSQL_POOL_TIMEOUT
+        # - seconds to wait for a connection; HBNB_MYSQL_POOL_RECYCLE -
+        # seconds after which a connection is replaced, below the server
+        # wait_timeout; HBNB_MYSQL_POOL_PRE_PING - 1 to test connections on
+        # checkout, 0 not to
+        options = {
+            "pool_recycle": int(getenv('HBNB_MYSQL_POOL_RECYCLE', 3600)),
+            "pool_pre_ping": getenv('HBNB_MYSQL_POOL_PRE_PING', '1') == '1'
+        }
+        url = make_url(HBNB_DB_URL)
+        if url.get_backend_name() != "sqlite" or \
+                url.database not in (None, "", ":memory:"):
+            options.update(
+                poolclass=TimedQueuePool,
+                pool_size=int(getenv('HBNB_MYSQL_POOL_SIZE', 5)),
+                max_overflow=int(getenv('HBNB_MYSQL_MAX_OVERFLOW', 10)),
+                pool_timeout=float(getenv('HBNB_MYSQL_POOL_TIMEOUT', 30)))
+        self.__engine = create_engine(HBNB_DB_URL, **options)
+        # HBNB_COUNTS_TTL - seconds counts() may answer from its last
+        # query, 0 (the default) to always query
+        self.__counts_ttl = float(getenv('HBNB_COUNTS_TTL', 0))
+        # HBNB_GET_CACHE_SIZE - number of objects get() keeps across
+        # requests, 0 (the default) to keep none
+        self.__cache_size = int(getenv('HBNB_GET_CACHE_SIZE', 0))
+        self.__cache = OrderedDict()
+        self.__cache_lock = Lock()
         if HBNB_ENV == "test":
             Base.metadata.drop_all(self.__engine, checkfirst=True)
 
-    def all(self, cls=None):
-        """query on the current database session"""
+    def all(self, cls=None, eager=(), loader="selectin"):
+        """query on the current database session. eager lists relationship
+        paths of cls, e.g. ("cities.places",), loaded along with the objects
+        using the loader strategy ("selectin", "joined" or "subquery")"""
         new_dict = {}
-        for clss in classes:
-            if cls is None or cls is classes[clss] or cls is clss:
-                objs = self.__session.query(classes[clss]).all()
-                for obj in objs:
-                    key = obj.__class__.__name__ + '.' + obj.id
-                    new_dict[key] = obj
+        for clss in self.__classes(cls):
+            query = self.__session.query(clss)
+            if eager:
+                query = query.options(*self.__options(clss, eager, loader))
+            objs = query.all()
+            for obj in objs:
+                key = obj.__class__.__name__ + '.' + obj.id
+                new_dict[key] = obj
         return (new_dict)
 
+    def iter_all(self, cls=None, batch_size=1000):
+        """yields the objects of cls (a class or a class name), or of every
+        class, reading the rows batch_size at a time from a server-side
+        cursor so that they never have to be held at once"""
+        for clss in self.__classes(cls):
+            query = self.__session.query(clss).yield_per(batch_size)
+            for obj in query:
+                yield obj
+
     def new(self, obj):
         """add the object to the current database session"""
         self.__session.add(obj)
@@ -58,34 +157,316 @@ class DBStorage:
     def save(self):
         """commit all changes of the current database session"""
         self.__session.commit()
+        self.__counts = None
 
     def delete(self, obj=None):
         """delete from the current database session obj if not None"""
         if obj is not None:
             self.__session.delete(obj)
             self.__session.commit()
+            self.__counts = None
+
+    def bulk_new(self, objs, chunk_size=1000):
+        """inserts the rows of the new objects objs with one executemany
+        INSERT per table and chunk of chunk_size rows, committing each
+        chunk, parents before children. Only the columns are written
+        (not relationship collections such as Place.amenities) and the
+        objects are not added to the session. Returns the number of rows
+        inserted"""
+        rows = {}
+        for obj in objs:
+            rows.setdefault(type(obj).__table__, []).append(self.__row(obj))
+        for table in Base.metadata.sorted_tables:
+            table_rows = rows.get(table, [])
+            for start in range(0, len(table_rows), chunk_size):
+                self.__session.execute(table.insert(),
+                                       table_rows[start:start + chunk_size])
+                self.__session.commit()
+        self.__counts = None
+        return sum(len(table_rows) for table_rows in rows.values())
+
+    def bulk_update(self, cls, rows, chunk_size=1000):
+        """sets the attributes of each dictionary of rows on the object of
+        cls with the id it holds, with one executemany UPDATE per set of
+        attributes and chunk of chunk_size rows, committing each chunk.
+        updated_at is set to now unless given. Raises KeyError, before
+        updating anything, on a key that is not an attribute of cls.
+        Returns the number of rows updated"""
+        names = attributes(cls)
+        mapper = sqlalchemy.inspect(cls)
+        now = datetime.now()
+        groups = {}
+        for row in rows:
+            obj = mapper.class_manager.new_instance()
+            for key, value in row.items():
+                if key not in names:
+                    raise KeyError(key)
+                if key != "id":
+                    setattr(obj, key, value)
+            values = {prop.columns[0].key: obj.__dict__[prop.key]
+                      for prop in mapper.column_attrs
+                      if prop.key != "id" and prop.key in obj.__dict__}
+            values.setdefault("updated_at", now)
+            values["_id"] = row["id"]
+            groups.setdefault(tuple(sorted(values)), []).append(values)
+        updated = 0
+        for columns, values in groups.items():
+            query = cls.__table__.update().where(
+                cls.__table__.c.id == bindparam("_id")).values(
+                {name: bindparam(name) for name in columns if name != "_id"})
+            for start in range(0, len(values), chunk_size):
+                updated += self.__session.execute(
+                    query, values[start:start + chunk_size]).rowcount
+                self.__session.commit()
+        with self.__cache_lock:
+            self.__version += 1
+            for row in rows:
+                self.__cache.pop(cls.__name__ + "." + row["id"], None)
+        for row in rows:
+            obj = self.__session.identity_map.get(identity_key(cls, row["id"]))
+            if obj is not None:
+                self.__session.expire(obj)
+        return updated
 
     def reload(self):
         """reloads data from the database"""
         Base.metadata.create_all(self.__engine)
         sess_factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+        event.listen(sess_factory, "after_flush", self.__flushed)
+        event.listen(sess_factory, "after_commit", self.__committed)
+        event.listen(sess_factory, "after_rollback", self.__rolled_back)
         Session = scoped_session(sess_factory)
         self.__session = Session
+        with self.__cache_lock:
+            self.__cache.clear()
 
     def close(self):
         """call remove() method on the private session attribute"""
         self.__session.remove()
 
-    def get(self, cls, id):
-        """Method to retrieve one object. Usage: get(<class>, <object id>)"""
+    def get(self, cls, id, eager=(), loader="selectin"):
+        """Method to retrieve one object. Usage: get(<class>, <object id>),
+        eager and loader as for all(). The object is looked up in the
+        session, then in the cache of HBNB_GET_CACHE_SIZE objects, and only
+        then in the database"""
+        if id is None:
+            return None
         try:
-            obj = self.__session.query(cls).filter(cls.id == id).first()
-            if obj:
+            if eager:
+                return self.__session.get(
+                    cls, id, options=self.__options(cls, eager, loader))
+            if not self.__cache_size:
+                return self.__session.get(cls, id)
+            obj = self.__cached(cls, id)
+            if obj is not None:
                 return obj
-            return None
+            with self.__cache_lock:
+                version = self.__version
+            obj = self.__session.get(cls, id)
+            if obj is not None:
+                self.__remember(obj, version)
+            return obj
         except Exception as e:
             return e
 
+    def get_many(self, cls, ids):
+        """Returns the objects of cls with the ids in ids, in the order of
+        ids and skipping the ids of no object, with one IN query for the
+        ones neither in the session nor in the cache"""
+        found = {}
+        missing = []
+        for id in set(ids) - {None}:
+            obj = self.__cached(cls, id)
+            if obj is None:
+                missing.append(id)
+            else:
+                found[id] = obj
+        with self.__cache_lock:
+            version = self.__version
+        # at most 500 bound parameters per query
+        for start in range(0, len(missing), 500):
+            for obj in self.__session.query(cls).filter(
+                    cls.id.in_(missing[start:start + 500])):
+                found[obj.id] = obj
+                if self.__cache_size:
+                    self.__remember(obj, version)
+        return [found[id] for id in ids if id in found]
+
+    def pool_stats(self):
+        """Returns the state of the connection pool: its size, the
+        connections checked out and opened past the size, and the number
+        of checkouts, those that timed out and the seconds spent waiting
+        in total and at most (None for pools other than TimedQueuePool)"""
+        pool = self.__engine.pool
+        if not isinstance(pool, TimedQueuePool):
+            return None
+        with pool.stats_lock:
+            return {"size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": max(pool.overflow(), 0),
+                    "checkouts": pool.checkouts,
+                    "timeouts": pool.timeouts,
+                    "wait_total": pool.wait_total,
+                    "wait_max": pool.wait_max}
+
     def count(self, cls=None):
-        """Method to count the number of objects in storage"""
-        return len(self.all(cls))
+        """Method to count the number of objects in storage, of class cls
+        (or its name) if given"""
+        if cls is None:
+            return sum(self.__query_counts().values())
+        return sum(self.__session.query(func.count(clss.id)).scalar()
+                   for clss in self.__classes(cls))
+
+    def counts(self):
+        """Returns the number of objects of each class, by class name, in
+        one query. Answered from the last query for HBNB_COUNTS_TTL seconds
+        unless this storage committed since"""
+        now = monotonic()
+        if self.__counts is None or now - self.__counts[0] >= \
+                self.__counts_ttl:
+            self.__counts = (now, self.__query_counts())
+        return dict(self.__counts[1])
+
+    def __query_counts(self):
+        """returns the number of rows of each class table, by class name,
+        with a UNION ALL of one COUNT(*) per table"""
+        query = union_all(*(
+            select(literal(name).label("name"),
+                   func.count().label("count")).select_from(
+                cls.__table__)
+            for name, cls in classes.items()))
+        return {name: count
+                for name, count in self.__session.execute(query)}
+
+    def page(self, cls, limit, after=None, fk=None, value=None):
+        """Returns at most limit objects of cls ordered by created_at then
+        id, starting after the (created_at, id) pair after, and only those
+        whose foreign key attribute fk holds value if fk is given, with a
+        range scan of the (created_at, id) index"""
+        query = self.__session.query(cls)
+        if fk is not None:
+            query = query.filter(getattr(cls, fk) == value)
+        if after is not None:
+            created_at, id = after
+            query = query.filter(or_(
+                cls.created_at > created_at,
+                and_(cls.created_at == created_at, cls.id > id)))
+        return query.order_by(cls.created_at, cls.id).limit(limit).all()
+
+    def search_places(self, states=(), cities=(), amenities=()):
+        """Returns the places of the cities of states and of cities (all
+        places if both are empty, or if they hold no place while amenities
+        is given) that have every amenity of amenities, in one query"""
+        located = query = self.__session.query(Place)
+        if states or cities:
+            located = query = query.join(City, Place.city_id == City.id).\
+                filter(or_(City.state_id.in_(states),
+                           Place.city_id.in_(cities)))
+        if amenities:
+            from models.place import place_amenity
+            wanted = set(amenities)
+            having_all = select(place_amenity.c.place_id).where(
+                place_amenity.c.amenity_id.in_(wanted)).group_by(
+                place_amenity.c.place_id).having(
+                func.count(place_amenity.c.amenity_id.distinct()) ==
+                len(wanted))
+            query = query.filter(Place.id.in_(having_all))
+        places = query.all()
+        if not places and amenities and (states or cities) and \
+                located.first() is None:
+            return self.search_places(amenities=amenities)
+        return places
+
+    @staticmethod
+    def __row(obj):
+        """returns the column values of obj by column name, column defaults
+        filling the values not set"""
+        row = {}
+        for prop in sqlalchemy.inspect(type(obj)).column_attrs:
+            column = prop.columns[0]
+            value = getattr(obj, prop.key)
+            if value is None and column.default is not None:
+                if column.default.is_scalar:
+                    value = column.default.arg
+                elif column.default.is_callable:
+                    value = column.default.arg(None)
+            row[column.key] = value
+        return row
+
+    def __cached(self, cls, id):
+        """returns the object of cls with id held by the session, or
+        attached to it from the cache, or None"""
+        obj = self.__session.identity_map.get(identity_key(cls, id))
+        if obj is not None or not self.__cache_size:
+            return obj
+        key = cls.__name__ + "." + id
+        with self.__cache_lock:
+            copy = self.__cache.get(key)
+            if copy is None:
+                return None
+            self.__cache.move_to_end(key)
+        return self.__session.merge(copy, load=False)
+
+    def __remember(self, obj, version):
+        """caches a detached copy of the column values of obj, unless a
+        commit changed objects since version"""
+        key = type(obj).__name__ + "." + obj.id
+        mapper = sqlalchemy.inspect(type(obj))
+        copy = mapper.class_manager.new_instance()
+        for attr in mapper.column_attrs:
+            set_committed_value(copy, attr.key, getattr(obj, attr.key))
+        make_transient_to_detached(copy)
+        with self.__cache_lock:
+            if version != self.__version:
+                return
+            self.__cache[key] = copy
+            self.__cache.move_to_end(key)
+            while len(self.__cache) > self.__cache_size:
+                self.__cache.popitem(last=False)
+
+    def __flushed(self, session, flush_context):
+        """notes the keys of the objects a flush of session changed"""
+        changed = session.info.setdefault("changed", set())
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            changed.add(type(obj).__name__ + "." + obj.id)
+
+    def __committed(self, session):
+        """drops the cached copies of the objects the commit changed"""
+        changed = session.info.pop("changed", None)
+        if changed:
+            with self.__cache_lock:
+                self.__version += 1
+                for key in changed:
+                    self.__cache.pop(key, None)
+
+    def __rolled_back(self, session):
+        """forgets the changes of the rolled back transaction"""
+        session.info.pop("changed", None)
+
+    @staticmethod
+    def __classes(cls):
+        """returns the list of the classes cls (a class, a class name or
+        None for every class) stands for"""
+        if cls is None:
+            return list(classes.values())
+        if type(cls) is str:
+            return [classes[cls]] if cls in classes else []
+        return [cls] if cls in classes.values() else []
+
+    @staticmethod
+    def __options(cls, eager, loader):
+        """returns the loader options eager loading each relationship path
+        of eager, starting from cls, with the loader strategy"""
+        options = []
+        for path in eager:
+            option = None
+            target = cls
+            for name in path.split("."):
+                attr = getattr(target, name)
+                if option is None:
+                    option = loaders[loader](attr)
+                else:
+                    option = getattr(option, loaders[loader].__name__)(attr)
+                target = attr.property.mapper.class_
+            options.append(option)
+        return options
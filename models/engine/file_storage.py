@@ -3,9 +3,17 @@
 Contains the FileStorage class
 """
 
+import atexit
+from bisect import bisect_right
+from datetime import datetime
 import json
+import os
+from os import getenv
+import threading
+from types import MappingProxyType
 from models.amenity import Amenity
-from models.base_model import BaseModel
+from models.base_model import BaseModel, attributes, format_time, parse_time
+from models.engine import binary_codec, json_stream, search
 from models.city import City
 from models.place import Place
 from models.review import Review
@@ -15,75 +23,812 @@ from models.user import User
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
            "Place": Place, "Review": Review, "State": State, "User": User}
 
+# attributes of each class holding the id of a parent object
+foreign_keys = {"City": ("state_id",), "Place": ("city_id", "user_id"),
+                "Review": ("place_id", "user_id")}
+# attributes of each class holding a list of ids of related objects
+list_keys = {"Place": ("amenity_ids",)}
+
 
 class FileStorage:
     """serializes instances to a JSON file & deserializes back to instances"""
 
+    # string - format of the snapshot files, "json" or "binary" (see
+    # models.engine.binary_codec)
+    __codec = getenv("HBNB_FILE_CODEC", "json")
     # string - path to the JSON file
-    __file_path = "file.json"
+    __file_path = "file.bin" if __codec == "binary" else "file.json"
     # dictionary - empty but will store all objects by <class name>.id
     __objects = {}
+    # dictionary - <class name> -> {<class name>.id: obj}, __objects split
+    # by class
+    __classes = {}
+    # dictionary - (<class name>, <foreign key>) -> {parent id: {key: obj}},
+    # and (<class name>, <list key>) -> {id in the list: {key: obj}}
+    __indexes = {}
+    # dictionary - (<class name>.id, <list key>) -> the ids the object is
+    # indexed by, as its list may be changed in place
+    __listed = {}
+    # string - path to the journal of changes made since the JSON file
+    __journal_path = __file_path + ".log"
+    # bool - append changes to a journal instead of rewriting __file_path,
+    # unless __shards_path is set
+    __journal = getenv("HBNB_FILE_JOURNAL") == "1"
+    # int - journal size in bytes past which it is folded into __file_path
+    __journal_max = int(getenv("HBNB_FILE_JOURNAL_MAX", 4 * 1024 * 1024))
+    # int - number of damaged journal records skipped by the last reload
+    __journal_skipped = 0
+    # dictionary - <class name>.id -> obj, or None once deleted, for the
+    # changes not written to the journal yet
+    __pending = {}
+    # tuple - (inode, size, mtime) of the JSON file and journal as last
+    # read or written, to skip reloads while they are unchanged
+    __signature = None
+    # dictionary - <class name>.id -> updated_at of the record last read or
+    # written for that object
+    __versions = {}
+    # bool - keep the records read from disk as they are and only turn
+    # them into objects when they are accessed
+    __lazy = getenv("HBNB_FILE_LAZY") == "1"
+    # dictionary - <class name> -> {<class name>.id: record}, the records
+    # read in lazy mode that were not turned into objects yet
+    __records = {}
+    # dictionary - (<class name>, <foreign key>) -> {parent id: {key:
+    # record}}, __indexes for the records of __records
+    __record_indexes = {}
+    # string - "sync" writes on every save(), "behind" leaves the writes
+    # to a background thread
+    __write_mode = getenv("HBNB_FILE_WRITE_MODE", "sync")
+    # float - seconds between two background writes
+    __flush_interval = float(getenv("HBNB_FILE_FLUSH_INTERVAL", 1))
+    # int - number of unwritten saves that triggers a background write
+    __flush_threshold = int(getenv("HBNB_FILE_FLUSH_THRESHOLD", 100))
+    # int - number of save() calls not written to disk yet
+    __dirty = 0
+    # thread - background writer of write-behind mode, once started
+    __flusher = None
+    __wakeup = threading.Event()
+    # string - what a write waits for before returning: "none" for the
+    # kernel to have the data, "file" for the file to be fsynced, "dir" for
+    # the directory holding it too
+    __durability = getenv("HBNB_FILE_DURABILITY", "file")
+    # lock - serializes disk reads and writes with the pending changes
+    __lock = threading.RLock()
+    # string - directory holding one <class name>.json file per class,
+    # used instead of __file_path and the journal when set
+    __shards_path = getenv("HBNB_FILE_SHARDS")
+    # set - names of the classes whose file was read into __objects
+    __shards_loaded = set()
+    # set - names of the classes with objects added or deleted since their
+    # file was last written
+    __shards_touched = set()
+    # dictionary - <class name> -> (inode, size, mtime) of its file as last
+    # read or written
+    __shards_signatures = {}
+    # dictionary - class name: sorted list of the (created_at, id) of its
+    # objects and records for page(), built on first use. Entries of
+    # objects stored since wait in __order_added until the next page(),
+    # entries of objects removed (or whose created_at changed) are skipped
+    __order = {}
+    __order_added = {}
 
-    def all(self, cls=None):
-        """returns the dictionary __objects"""
+    def all(self, cls=None, eager=(), loader=None):
+        """returns the dictionary __objects, or a read-only live view of
+        the objects of cls (a class or a class name). eager and loader are
+        accepted for DBStorage compatibility: relationships are always in
+        memory here"""
         if cls is not None:
-            new_dict = {}
-            for key, value in self.__objects.items():
-                if cls == value.__class__ or cls == value.__class__.__name__:
-                    new_dict[key] = value
-            return new_dict
+            name = cls if type(cls) is str else getattr(cls, "__name__", "")
+            if self.__shards_path and name not in self.__shards_loaded:
+                self.__load_shard(name)
+            self.__hydrate(name)
+            return MappingProxyType(self.__classes.get(name, {}))
+        if self.__shards_path:
+            for name in classes:
+                if name not in self.__shards_loaded:
+                    self.__load_shard(name)
+        for name in list(self.__records):
+            self.__hydrate(name)
         return self.__objects
 
+    def iter_all(self, cls=None, batch_size=None):
+        """yields the objects of cls (a class or a class name), or every
+        object, as all() returns them. batch_size is accepted for DBStorage
+        compatibility: the objects are already in memory here"""
+        yield from tuple(self.all(cls).values())
+
     def new(self, obj):
         """sets in __objects the obj with key <obj class name>.id"""
         if obj is not None:
-            key = obj.__class__.__name__ + "." + obj.id
-            self.__objects[key] = obj
+            name = obj.__class__.__name__
+            key = name + "." + obj.id
+            if self.__shards_path:
+                if name not in self.__shards_loaded:
+                    self.__load_shard(name)
+                self.__shards_touched.add(name)
+            if self.__objects.get(key) is obj:
+                # its lists of ids may have been changed in place
+                self.__index_lists(key, obj)
+            else:
+                self.__store(key, obj)
+            self.__log(key, obj)
 
     def save(self):
-        """serializes __objects to the JSON file (path: __file_path)"""
-        json_objects = {}
-        for key in self.__objects.keys():
-            json_objects[key] = self.__objects[key].to_dict()
-        with open(self.__file_path, 'w') as f:
-            json.dump(json_objects, f, indent=4)
+        """serializes __objects to the JSON file (path: __file_path), or
+        appends the pending changes to the journal in journaled mode. In
+        write-behind mode the write is left to a background thread"""
+        if self.__write_mode != "behind":
+            self.__write()
+            return
+        FileStorage.__dirty += 1
+        if FileStorage.__flusher is None:
+            self.__start_flusher()
+        if self.__dirty >= self.__flush_threshold:
+            self.__wakeup.set()
+
+    def bulk_new(self, objs):
+        """adds the objects objs and saves them all at once. Returns the
+        number of objects added"""
+        count = 0
+        for obj in objs:
+            self.new(obj)
+            count += 1
+        self.save()
+        return count
+
+    def bulk_update(self, cls, rows):
+        """sets the attributes of each dictionary of rows on the object of
+        cls with the id it holds, and saves them all at once. updated_at
+        is set to now unless given. Returns the number of objects
+        updated. Raises KeyError, before updating anything, on a key that
+        is not an attribute of cls"""
+        names = attributes(cls)
+        for row in rows:
+            for key in row:
+                if key not in names:
+                    raise KeyError(key)
+        now = datetime.now()
+        count = 0
+        for row in rows:
+            obj = self.get(cls, row["id"])
+            if obj is None:
+                continue
+            for key, value in row.items():
+                if key != "id":
+                    setattr(obj, key, value)
+            if "updated_at" not in row:
+                obj.updated_at = now
+            self.new(obj)
+            count += 1
+        self.save()
+        return count
+
+    def flush(self):
+        """writes the changes saved in write-behind mode to disk now"""
+        if self.__dirty:
+            self.__write()
 
     def reload(self):
-        """deserializes the JSON file to __objects"""
-        try:
-            with open(self.__file_path, 'r') as f:
-                jo = json.load(f)
-            for key in jo:
-                self.__objects[key] = classes[jo[key]["__class__"]](**jo[key])
-        except Exception:
-            pass
+        """deserializes the JSON file to __objects, then replays the
+        journal over it in journaled mode. Nothing is read while the files
+        are unchanged, and only records that changed since they were last
+        read or written are turned back into objects, or kept as records
+        until they are accessed in lazy mode. With one file per class, only
+        the files of the classes already read are looked at"""
+        if self.__shards_path:
+            for name in list(self.__shards_loaded):
+                self.__load_shard(name)
+            return
+        signature = self.__stat()
+        if signature == self.__signature:
+            return
+        with self.__lock:
+            try:
+                for key, record in self.__read(self.__file_path):
+                    self.__merge(key, record)
+            except Exception:
+                pass
+            if self.__journal:
+                self.__replay_journal()
+            FileStorage.__signature = signature
 
     def delete(self, obj=None):
         """delete obj from __objects if it’s inside"""
         if obj is not None:
-            key = obj.__class__.__name__ + '.' + obj.id
-            if key in self.__objects:
-                del self.__objects[key]
+            name = obj.__class__.__name__
+            key = name + '.' + obj.id
+            if self.__shards_path and name not in self.__shards_loaded:
+                self.__load_shard(name)
+            if key in self.__objects or \
+                    key in self.__records.get(name, {}):
+                self.__remove(key)
+                self.__shards_touched.add(name)
+                self.__log(key, None)
         self.save()
 
+    def compact(self):
+        """folds the journal into a new snapshot of __objects"""
+        with self.__lock:
+            self.__dump(self.__file_path, self.__snapshot())
+            open(self.__journal_path, 'w').close()
+            self.__pending.clear()
+            FileStorage.__signature = self.__stat()
+
     def close(self):
         """call reload() method for deserializing the JSON file to objects"""
         self.reload()
 
-    def get(self, cls, id):
-        """Returns an object based on the class and its id"""
+    def get(self, cls, id, eager=(), loader=None):
+        """Returns an object based on the class and its id, eager and
+        loader being ignored as in all()"""
         try:
             key = '{}.{}'.format(cls.__name__, id)
         except AttributeError:
             return None
+        if self.__shards_path and cls.__name__ not in self.__shards_loaded:
+            self.__load_shard(cls.__name__)
+        if key in self.__records.get(cls.__name__, {}):
+            self.__hydrate(cls.__name__, [key])
 
         if key in self.__objects.keys():
             return self.__objects[key]
         return None
 
+    def get_many(self, cls, ids):
+        """Returns the objects of cls with the ids in ids, in the order of
+        ids and skipping the ids of no object, building only those still
+        held as records in lazy mode"""
+        name = getattr(cls, "__name__", None)
+        if name is None:
+            return []
+        if self.__shards_path and name not in self.__shards_loaded:
+            self.__load_shard(name)
+        keys = [name + "." + str(id) for id in ids]
+        if self.__records.get(name):
+            self.__hydrate(name, keys)
+        objects = self.__classes.get(name, {})
+        return [objects[key] for key in keys if key in objects]
+
     def count(self, cls=None):
         """Returns number of objects in storage matching a given class,
-        or all objects if no class given"""
+        or all objects if no class given. Records not turned into objects
+        yet in lazy mode are counted as they are"""
         if cls:
-            return len(self.all(cls))
-        return len(self.all())
+            names = [cls if type(cls) is str else cls.__name__]
+        else:
+            names = list(classes)
+        total = 0
+        for name in names:
+            if self.__shards_path and name not in self.__shards_loaded:
+                self.__load_shard(name)
+            total += len(self.__classes.get(name, {}))
+            total += len(self.__records.get(name, {}))
+        return total
+
+    def counts(self):
+        """Returns the number of objects of each class, by class name"""
+        return {name: self.count(name) for name in classes}
+
+    def related(self, cls, fk, value):
+        """Returns the list of cls objects whose foreign key attribute fk
+        holds value, e.g. related(City, 'state_id', state.id)"""
+        name = cls if type(cls) is str else cls.__name__
+        if self.__shards_path and name not in self.__shards_loaded:
+            self.__load_shard(name)
+        records = self.__record_indexes.get((name, fk), {}).get(value)
+        if records:
+            self.__hydrate(name, list(records))
+        children = self.__indexes.get((name, fk), {}).get(value, {})
+        return list(children.values())
+
+    def related_keys(self, cls, fk, value):
+        """Returns the set of the keys of the cls objects whose foreign key
+        attribute fk holds value, or whose list attribute fk (list_keys)
+        contains it, without turning lazy records into objects"""
+        name = cls if type(cls) is str else cls.__name__
+        if self.__shards_path and name not in self.__shards_loaded:
+            self.__load_shard(name)
+        keys = set(self.__indexes.get((name, fk), {}).get(value, ()))
+        keys.update(self.__record_indexes.get((name, fk), {}).get(value, ()))
+        return keys
+
+    def page(self, cls, limit, after=None, fk=None, value=None):
+        """Returns at most limit objects of cls ordered by created_at then
+        id, starting after the (created_at, id) pair after, and only those
+        whose foreign key attribute fk holds value if fk is given. Only
+        the objects returned are built from their records in lazy mode"""
+        name = cls.__name__
+        if self.__shards_path and name not in self.__shards_loaded:
+            self.__load_shard(name)
+        with self.__lock:
+            if fk is None:
+                entries = self.__sorted(name)
+            else:
+                entries = sorted(
+                    self.__entry(name, key)
+                    for key in self.related_keys(cls, fk, value))
+            ids = []
+            last = None
+            start = bisect_right(entries, after) if after else 0
+            for entry in entries[start:]:
+                if len(ids) == limit:
+                    break
+                if entry != last and entry == self.__entry(
+                        name, name + "." + entry[1]):
+                    ids.append(entry[1])
+                last = entry
+        return self.get_many(cls, ids)
+
+    def search_places(self, states=(), cities=(), amenities=()):
+        """Returns the places of the cities of states and of cities having
+        every amenity of amenities, see models.engine.search"""
+        return search.search_places(self, states, cities, amenities)
+
+    def update_index(self, obj, attr, old):
+        """Moves a stored obj to the right index bucket after its foreign
+        key (or list of ids) attribute attr changed from old, or to its
+        place in the created_at order after it changed"""
+        name = obj.__class__.__name__
+        if attr not in foreign_keys.get(name, ()) and \
+                attr not in list_keys.get(name, ()) and attr != "created_at":
+            return
+        key = "{}.{}".format(name, obj.__dict__.get("id"))
+        if self.__objects.get(key) is not obj:
+            return
+        if attr == "created_at":
+            self.__order_add(name, obj.created_at, obj.id)
+            return
+        if attr in list_keys.get(name, ()):
+            self.__index_lists(key, obj)
+            return
+        index = self.__indexes.setdefault((name, attr), {})
+        bucket = index.get(old)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del index[old]
+        index.setdefault(getattr(obj, attr), {})[key] = obj
+
+    def __write(self):
+        """writes __objects, or the pending changes in journaled mode, to
+        disk, counting the saves back as unwritten if that fails"""
+        with self.__lock:
+            dirty = self.__dirty
+            FileStorage.__dirty = 0
+            try:
+                if self.__shards_path:
+                    self.__write_shards()
+                    return
+                if self.__journal:
+                    self.__append_journal()
+                    return
+                self.__dump(self.__file_path, self.__snapshot())
+                FileStorage.__signature = self.__stat()
+            except Exception:
+                FileStorage.__dirty += dirty
+                raise
+
+    def __start_flusher(self):
+        """starts the thread writing the saves of write-behind mode every
+        __flush_interval seconds or once __flush_threshold of them wait,
+        and the last write when the interpreter exits"""
+        with self.__lock:
+            if FileStorage.__flusher is not None:
+                return
+            FileStorage.__flusher = threading.Thread(
+                target=self.__flush_loop, name="FileStorage", daemon=True)
+            atexit.register(self.flush)
+            FileStorage.__flusher.start()
+
+    def __flush_loop(self):
+        """body of the write-behind thread"""
+        while True:
+            self.__wakeup.wait(self.__flush_interval)
+            self.__wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+    def __snapshot(self):
+        """returns the dictionary of every object in __objects serialized"""
+        json_objects = {}
+        for key, obj in list(self.__objects.items()):
+            json_objects[key] = self.__serialize(key, obj)
+        for records in self.__records.values():
+            json_objects.update(records)
+        return json_objects
+
+    def __serialize(self, key, obj):
+        """returns the record of obj, the one cached by obj itself, which is
+        only built again if obj changed since it was last serialized"""
+        record = obj._record()
+        if getattr(obj, "_dirty", True):
+            obj._dirty = False
+            self.__versions[key] = record.get("updated_at")
+        return record
+
+    def __read(self, path):
+        """yields the (key, record) pairs of the snapshot file at path as
+        they are decoded, never holding the whole file at once"""
+        if self.__codec == "binary":
+            with open(path, 'rb') as f:
+                yield from binary_codec.iter_records(f)
+            return
+        with open(path, 'r') as f:
+            yield from json_stream.iter_records(f)
+
+    def __dump(self, path, records):
+        """writes records with the codec to a temporary file then renames
+        it over path, so that readers and crashes see either the previous or
+        the new content, syncing to disk as __durability asks"""
+        tmp_path = "{}.{}.tmp".format(path, os.getpid())
+        binary = self.__codec == "binary"
+        try:
+            with open(tmp_path, 'wb' if binary else 'w') as f:
+                if binary:
+                    binary_codec.dump(records, f)
+                else:
+                    json.dump(records, f, indent=4, default=self.__default)
+                if self.__durability != "none":
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if self.__durability == "dir":
+            self.__fsync_dir(path)
+
+    @staticmethod
+    def __default(value):
+        """serializes the datetime objects of records read from a binary
+        snapshot when writing JSON"""
+        if type(value) is datetime:
+            return format_time(value)
+        raise TypeError("{} is not JSON serializable".format(repr(value)))
+
+    def __shard_path(self, name):
+        """returns the path of the file holding the objects of class name"""
+        extension = ".bin" if self.__codec == "binary" else ".json"
+        return os.path.join(self.__shards_path, name + extension)
+
+    @staticmethod
+    def __fsync_dir(path):
+        """fsyncs the directory holding path, making a rename or creation
+        of path durable"""
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __write_shards(self):
+        """rewrites the file of each class with objects added, deleted or
+        changed since it was last written"""
+        for name in list(self.__shards_loaded):
+            objs = list(self.__classes.get(name, {}).items())
+            if name not in self.__shards_touched and not any(
+                    getattr(obj, "_dirty", True) for key, obj in objs):
+                continue
+            self.__shards_touched.discard(name)
+            records = {}
+            for key, obj in objs:
+                records[key] = self.__serialize(key, obj)
+            records.update(self.__records.get(name, {}))
+            path = self.__shard_path(name)
+            os.makedirs(self.__shards_path, exist_ok=True)
+            self.__dump(path, records)
+            self.__shards_signatures[name] = self.__stat_path(path)
+
+    def __load_shard(self, name):
+        """reads the file of class name into __objects, unless it is
+        unchanged since it was last read or written"""
+        if name not in classes:
+            return
+        path = self.__shard_path(name)
+        with self.__lock:
+            signature = self.__stat_path(path)
+            if signature != self.__shards_signatures.get(name):
+                try:
+                    for key, record in self.__read(path):
+                        self.__merge(key, record)
+                except (OSError, ValueError):
+                    pass
+                self.__shards_signatures[name] = signature
+            self.__shards_loaded.add(name)
+
+    def __stat(self):
+        """returns the (inode, size, mtime) of the JSON file, and of the
+        journal in journaled mode, None standing for a missing file"""
+        paths = [self.__file_path]
+        if self.__journal:
+            paths.append(self.__journal_path)
+        return tuple(self.__stat_path(path) for path in paths)
+
+    @staticmethod
+    def __stat_path(path):
+        """returns the (inode, size, mtime) of path, None if it is missing"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    @staticmethod
+    def __build(record):
+        """returns the object of record. Records with an id and both
+        timestamps fill __dict__ directly, skipping the attribute by
+        attribute set of BaseModel.__init__"""
+        cls = classes[record["__class__"]]
+        created = record.get("created_at")
+        updated = record.get("updated_at")
+        if "id" not in record or not created or not updated or \
+                type(created) not in (str, datetime) or \
+                type(updated) not in (str, datetime):
+            return cls(**record)
+        obj = cls.__new__(cls)
+        attrs = obj.__dict__
+        attrs.update(record)
+        del attrs["__class__"]
+        if type(created) is str:
+            attrs["created_at"] = parse_time(created)
+        if type(updated) is str:
+            attrs["updated_at"] = parse_time(updated)
+        return obj
+
+    def __merge(self, key, record):
+        """stores an object built from record under key, unless the stored
+        object already comes from the same version of the record. The
+        record is not kept: the object is serialized again on its first
+        save rather than holding the dataset twice in memory"""
+        if (key in self.__objects and key in self.__versions and
+                self.__versions[key] == record.get("updated_at")):
+            return
+        if self.__lazy and key not in self.__objects:
+            self.__keep(key, record)
+        else:
+            self.__store(key, self.__build(record))
+        self.__versions[key] = record.get("updated_at")
+
+    def __keep(self, key, record):
+        """holds record under key in __records until it is accessed"""
+        name = record["__class__"]
+        if name not in classes:
+            raise KeyError(name)
+        self.__drop(key)
+        self.__records.setdefault(name, {})[key] = record
+        if name in self.__order:
+            created = record.get("created_at")
+            self.__order_add(name, parse_time(created)
+                             if type(created) is str else created,
+                             record.get("id"))
+        for fk in foreign_keys.get(name, ()):
+            index = self.__record_indexes.setdefault((name, fk), {})
+            index.setdefault(record.get(fk), {})[key] = record
+        for attr in list_keys.get(name, ()):
+            index = self.__record_indexes.setdefault((name, attr), {})
+            for value in set(record.get(attr) or ()):
+                index.setdefault(value, {})[key] = record
+
+    def __drop(self, key):
+        """takes the record held under key out of __records"""
+        name = key.partition(".")[0]
+        record = self.__records.get(name, {}).pop(key, None)
+        if record is None:
+            return
+        for fk in foreign_keys.get(name, ()):
+            index = self.__record_indexes.get((name, fk), {})
+            bucket = index.get(record.get(fk))
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del index[record.get(fk)]
+        for attr in list_keys.get(name, ()):
+            index = self.__record_indexes.get((name, attr), {})
+            for value in set(record.get(attr) or ()):
+                self.__discard(index, value, key)
+
+    def __hydrate(self, name, keys=None):
+        """turns the records of class name held in __records, or only
+        those under keys, into objects stored in __objects"""
+        if not self.__records.get(name):
+            return
+        with self.__lock:
+            records = self.__records.get(name, {})
+            for key in list(records) if keys is None else keys:
+                record = records.get(key)
+                if record is not None:
+                    version = self.__versions.get(key)
+                    self.__store(key, self.__build(record))
+                    self.__versions[key] = version
+
+    def __entry(self, name, key):
+        """returns the (created_at, id) of the object or record of class
+        name stored under key, or None"""
+        obj = self.__classes.get(name, {}).get(key)
+        if obj is not None:
+            return (obj.created_at, obj.id)
+        record = self.__records.get(name, {}).get(key)
+        if record is not None:
+            created = record.get("created_at")
+            if type(created) is str:
+                created = parse_time(created)
+            return (created, record["id"])
+        return None
+
+    def __sorted(self, name):
+        """returns the sorted (created_at, id) list of class name, merging
+        the entries added since the last call, or building it again once
+        it holds mostly stale entries"""
+        order = self.__order.get(name)
+        size = len(self.__classes.get(name, {})) + \
+            len(self.__records.get(name, {}))
+        if order is None or len(order) > 2 * size + 64:
+            order = sorted(
+                self.__entry(name, key)
+                for objects in (self.__classes, self.__records)
+                for key in objects.get(name, {}))
+            self.__order_added.pop(name, None)
+        elif self.__order_added.get(name):
+            order.extend(self.__order_added.pop(name))
+            order.sort()
+        FileStorage.__order[name] = order
+        return order
+
+    def __order_add(self, name, created_at, id):
+        """queues the (created_at, id) entry of an object of class name
+        stored, if the sorted list of the class was built"""
+        if name in self.__order:
+            self.__order_added.setdefault(name, []).append((created_at, id))
+
+    def __log(self, key, obj):
+        """queues the change of the object stored under key, None once it
+        is deleted, for the journal in journaled mode"""
+        if self.__journal and not self.__shards_path:
+            with self.__lock:
+                self.__pending[key] = obj
+
+    def __append_journal(self):
+        """writes one compact upsert or delete record per pending change
+        at the end of the journal, after a torn last record is cut off,
+        compacting it once it grew too big"""
+        if not self.__pending:
+            return
+        lines = []
+        for key, obj in self.__pending.items():
+            if obj is None:
+                record = {"op": "delete", "key": key}
+            else:
+                record = {"op": "upsert", "key": key,
+                          "obj": self.__serialize(key, obj)}
+            lines.append(json.dumps(record, separators=(',', ':'),
+                                    default=self.__default) + "\n")
+        with open(self.__journal_path, 'a+b') as f:
+            created = f.tell() == 0
+            if not created:
+                self.__trim_journal(f)
+            f.write("".join(lines).encode("utf-8"))
+            f.flush()
+            if self.__durability != "none":
+                os.fsync(f.fileno())
+            size = f.tell()
+        if created and self.__durability == "dir":
+            self.__fsync_dir(self.__journal_path)
+        self.__pending.clear()
+        FileStorage.__signature = self.__stat()
+        if size > self.__journal_max:
+            self.compact()
+
+    def __trim_journal(self, f):
+        """cuts off the end of the journal file object f, opened for
+        appending, past its last complete record, a record left incomplete
+        by a crash, so that the next append starts on a new line"""
+        end = f.seek(0, os.SEEK_END)
+        size = end
+        while end:
+            start = max(0, end - 4096)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b"\n")
+            if newline != -1:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            f.truncate(end)
+
+    def __replay_journal(self):
+        """applies the journal records to __objects, skipping and counting
+        in __journal_skipped the damaged ones. A last record left
+        incomplete by a crash is ignored here, and cut off by the next
+        append"""
+        FileStorage.__journal_skipped = 0
+        try:
+            f = open(self.__journal_path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                    if record["op"] == "delete":
+                        self.__remove(record["key"])
+                    else:
+                        self.__merge(record["key"], record["obj"])
+                except (ValueError, KeyError, TypeError):
+                    FileStorage.__journal_skipped += 1
+
+    def __remove(self, key):
+        """takes the object stored under key out of __objects"""
+        obj = self.__objects.pop(key, None)
+        self.__drop(key)
+        self.__versions.pop(key, None)
+        if obj is not None:
+            self.__classes.get(obj.__class__.__name__, {}).pop(key, None)
+            self.__unindex(key, obj)
+
+    def __store(self, key, obj):
+        """puts obj in __objects under key and indexes its foreign keys"""
+        current = self.__objects.get(key)
+        if current is obj:
+            return
+        self.__drop(key)
+        if current is not None:
+            self.__versions.pop(key, None)
+            self.__classes.get(current.__class__.__name__, {}).pop(key, None)
+            self.__unindex(key, current)
+        self.__objects[key] = obj
+        name = obj.__class__.__name__
+        self.__classes.setdefault(name, {})[key] = obj
+        self.__order_add(name, obj.created_at, obj.id)
+        for fk in foreign_keys.get(name, ()):
+            index = self.__indexes.setdefault((name, fk), {})
+            index.setdefault(getattr(obj, fk), {})[key] = obj
+        self.__index_lists(key, obj)
+
+    def __unindex(self, key, obj):
+        """removes obj stored under key from the foreign key indexes"""
+        name = obj.__class__.__name__
+        for fk in foreign_keys.get(name, ()):
+            index = self.__indexes.get((name, fk), {})
+            bucket = index.get(getattr(obj, fk))
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del index[getattr(obj, fk)]
+        self.__unindex_lists(key, name)
+
+    def __index_lists(self, key, obj):
+        """indexes obj stored under key by the ids its list attributes hold
+        now, instead of the ones they held when last indexed"""
+        name = obj.__class__.__name__
+        self.__unindex_lists(key, name)
+        for attr in list_keys.get(name, ()):
+            ids = tuple(set(getattr(obj, attr, None) or ()))
+            if not ids:
+                continue
+            self.__listed[(key, attr)] = ids
+            index = self.__indexes.setdefault((name, attr), {})
+            for value in ids:
+                index.setdefault(value, {})[key] = obj
+
+    def __unindex_lists(self, key, name):
+        """removes the object of class name stored under key from the
+        indexes of its list attributes"""
+        for attr in list_keys.get(name, ()):
+            index = self.__indexes.get((name, attr), {})
+            for value in self.__listed.pop((key, attr), ()):
+                self.__discard(index, value, key)
+
+    @staticmethod
+    def __discard(index, value, key):
+        """removes key from the bucket of value in index, and the bucket
+        once empty"""
+        bucket = index.get(value)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del index[value]
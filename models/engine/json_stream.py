@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Contains iter_records, an incremental reader of the JSON snapshot of
+FileStorage: it decodes the top-level object one member at a time from a
+file read in chunks, so the whole document never has to be held at once.
+"""
+
+import json
+
+_decoder = json.JSONDecoder()
+_whitespace = " \t\n\r"
+
+
+def iter_records(f, chunk_size=1 << 16):
+    """yields the (key, value) pairs of the JSON object in the text file
+    object f, in file order"""
+    reader = _Reader(f, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        if reader.peek() != "\"":
+            raise ValueError("expected a string key at {}".format(
+                repr(reader.buf[reader.pos:reader.pos + 20])))
+        key = reader.value()
+        reader.expect(":")
+        yield key, reader.value()
+        if reader.expect(",}") == "}":
+            return
+
+
+class _Reader:
+    """buffered view of a text file for iter_records"""
+    def __init__(self, f, chunk_size):
+        """starts reading f chunk_size characters at a time"""
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """reads one more chunk, dropping what was already decoded"""
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        """returns the next character that is not whitespace"""
+        while True:
+            while self.pos < len(self.buf) and \
+                    self.buf[self.pos] in _whitespace:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                raise ValueError("unexpected end of JSON document")
+            self.fill()
+
+    def expect(self, chars):
+        """consumes and returns the next character, one of chars"""
+        char = self.peek()
+        if char not in chars:
+            raise ValueError("expected one of {} at {}".format(
+                repr(chars), repr(self.buf[self.pos:self.pos + 20])))
+        self.pos += 1
+        return char
+
+    def value(self):
+        """decodes the next JSON value, reading more of the file until it
+        is complete"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            if end < len(self.buf) or self.eof:
+                self.pos = end
+                return value
+            self.fill()
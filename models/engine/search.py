@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+"""
+Contains search_places, the query engine of /places_search over the
+indexes of FileStorage: the cities of a state, the places of a city and
+the places listing an amenity are looked up by id, and the request is
+evaluated with set unions and intersections of place keys.
+"""
+
+from operator import attrgetter
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+
+
+def search_places(storage, states=(), cities=(), amenities=()):
+    """returns the places of the cities of states and of cities (all
+    places if both are empty, or if they hold no place while amenities is
+    given) that have every amenity of amenities, ordered by creation date
+    then id"""
+    located = set()
+    for state in storage.get_many(State, set(states)):
+        for city_key in storage.related_keys(City, "state_id", state.id):
+            located |= storage.related_keys(Place, "city_id",
+                                            _id(city_key))
+    for city in storage.get_many(City, set(cities)):
+        located |= storage.related_keys(Place, "city_id", city.id)
+    if not amenities:
+        found = located
+    else:
+        wanted = set(amenities)
+        if len(storage.get_many(Amenity, wanted)) < len(wanted):
+            return []
+        having = sorted((storage.related_keys(Place, "amenity_ids", value)
+                         for value in wanted), key=len)
+        found = having[0].intersection(*having[1:])
+        if located:
+            found &= located
+    places = storage.get_many(Place, [_id(key) for key in found])
+    places.sort(key=attrgetter("created_at", "id"))
+    return places
+
+
+def _id(key):
+    """returns the id part of a <class name>.id key"""
+    return key.partition(".")[2]
@@ -0,0 +1,50 @@
+#!/usr/bin/python3
+"""
+Contains the place searches the storage engines and /places_search are
+tested with, and the relationship walk that gives their expected places
+"""
+from models.amenity import Amenity
+from models.city import City
+from models.place import Place
+from models.state import State
+
+
+def bodies(states, cities, amenities):
+    """Returns the search bodies to test over the lists of ids of two
+    states, three cities (the first two in the first state) and two
+    amenities"""
+    return [
+        {"states": states[:1]},
+        {"cities": cities[1:]},
+        {"states": states[1:], "cities": cities[:1]},
+        {"states": states[:1], "cities": cities[:1]},
+        {"amenities": amenities[:1]},
+        {"amenities": amenities},
+        {"states": states, "amenities": amenities[1:]},
+        {"cities": cities[2:], "amenities": amenities},
+        {"cities": ["missing"], "amenities": amenities},
+        {"states": states, "amenities": amenities + ["missing"]},
+        {"states": ["missing"]},
+    ]
+
+
+def walk(storage, states, cities, amenities):
+    """Returns the sorted ids of the places storage finds by walking the
+    relationships, as the search did before"""
+    found = []
+    for state_id in states:
+        state = storage.get(State, state_id)
+        if state:
+            for city in state.cities:
+                found.extend(city.places)
+    for city_id in cities:
+        city = storage.get(City, city_id)
+        if city:
+            found.extend(p for p in city.places if p not in found)
+    if amenities:
+        if not found:
+            found = storage.all(Place).values()
+        wanted = [storage.get(Amenity, a_id) for a_id in amenities]
+        found = [p for p in found
+                 if all(am in p.amenities for am in wanted)]
+    return sorted(place.id for place in found)
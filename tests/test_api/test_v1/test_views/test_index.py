@@ -43,6 +43,17 @@ class TestIndex(unittest.TestCase):
                     "amenities"]:
             self.assertIn(typ, json_format.keys())
 
+    def test_stats_cache(self):
+        """Tests that the route /stats/cache returns the serialization cache
+        counters, and code 200"""
+        ret = self.app.get('{}/stats/cache'.format(self.path))
+
+        self.assertEqual(ret.status_code, 200)
+        json_format = getJson(ret)
+        for key in ["hits", "misses", "hit_rate"]:
+            self.assertIn(key, json_format.keys())
+        self.assertTrue(0 <= json_format["hit_rate"] <= 1)
+
 
 if __name__ == "__main__":
     unittest.main()
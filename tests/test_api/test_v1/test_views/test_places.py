@@ -1,13 +1,17 @@
 #!/usr/bin/python3
 """Test module for Places view."""
 import unittest
+import models
 from models import storage
 from api.v1.app import app
+from models.amenity import Amenity
 from models.place import Place
 from models.city import City
 from models.state import State
 from models.user import User
 import json
+import sqlalchemy
+from tests import search_cases
 
 
 class TestPlacesViews(unittest.TestCase):
@@ -154,3 +158,136 @@ class TestPlacesViews(unittest.TestCase):
         """Clean up objects created in setUp"""
         storage.delete(cls.state)
         storage.delete(cls.user)
+
+    def test_places_search_bad_ids(self):
+        """test that places_search answers 400 to ids that are not a list
+        of strings"""
+        for body in ({'states': [['x']]}, {'cities': 'x'},
+                     {'amenities': [1]}, {'states': [{}]}):
+            with self.subTest(body=body):
+                res = self.app.post('/api/v1/places_search', json=body)
+                self.assertEqual(res.status_code, 400)
+                self.assertEqual(res.json, {'message': 'Not a list of ids'})
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestPlacesSearchQueries(unittest.TestCase):
+    """Test the number of SQL statements /places_search issues"""
+    @classmethod
+    def setUpClass(cls):
+        """set up the flask app in testing mode."""
+        app.config['TESTING'] = True
+        cls.app = app.test_client()
+        cls.user = User(email='search@user', password='pass')
+        cls.user.save()
+        cls.amenity = Amenity(name='Wifi')
+        cls.amenity.save()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up objects created in setUpClass"""
+        storage.delete(storage.get(Amenity, cls.amenity.id))
+        storage.delete(storage.get(User, cls.user.id))
+
+    def make_state(self, size):
+        """Returns a state with size cities of size places each, every
+        other place having the amenity"""
+        state = State(name='Search')
+        state.save()
+        for i in range(size):
+            city = City(name='City', state_id=state.id)
+            city.save()
+            for j in range(size):
+                place = Place(name='Place', city_id=city.id,
+                              user_id=self.user.id)
+                if j % 2 == 0:
+                    place.amenities.append(self.amenity)
+                place.save()
+        storage.close()
+        return state
+
+    def search(self, state):
+        """Returns the places found for the state and the amenity, and the
+        number of SQL statements the search issued"""
+        statements = []
+
+        def count(*args):
+            """records one statement"""
+            statements.append(args[2])
+        engine = storage._DBStorage__engine
+        sqlalchemy.event.listen(engine, "before_cursor_execute", count)
+        try:
+            res = self.app.post('/api/v1/places_search',
+                                json={'states': [state.id],
+                                      'amenities': [self.amenity.id]})
+        finally:
+            sqlalchemy.event.remove(engine, "before_cursor_execute", count)
+        self.assertEqual(res.status_code, 200)
+        return res.json, len(statements)
+
+    def test_constant_statements(self):
+        """Test that the statements do not grow with the cities and places
+        searched"""
+        small = self.make_state(2)
+        large = self.make_state(6)
+        small_places, small_count = self.search(small)
+        large_places, large_count = self.search(large)
+        self.assertEqual(len(small_places), 2 * 1)
+        self.assertEqual(len(large_places), 6 * 3)
+        self.assertEqual(small_count, large_count, (small_count, large_count))
+        storage.delete(storage.get(State, small.id))
+        storage.delete(storage.get(State, large.id))
+
+
+@unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+class TestPlacesSearchPushdown(unittest.TestCase):
+    """Test that /places_search compiled to SQL finds the places the
+    search walking the relationships found"""
+    @classmethod
+    def setUpClass(cls):
+        """Creates two states, three cities, two amenities and places with
+        every combination of them"""
+        app.config['TESTING'] = True
+        cls.app = app.test_client()
+        cls.user = User(email='pushdown@user', password='pass')
+        cls.user.save()
+        cls.states = [State(name='Pushdown') for i in range(2)]
+        cls.amenities = [Amenity(name='Amenity') for i in range(2)]
+        for obj in cls.states + cls.amenities:
+            obj.save()
+        cls.cities = [City(name='City', state_id=cls.states[i // 2].id)
+                      for i in range(3)]
+        for city in cls.cities:
+            city.save()
+            for i in range(4):
+                place = Place(name='Place', city_id=city.id,
+                              user_id=cls.user.id)
+                if i & 1:
+                    place.amenities.append(cls.amenities[0])
+                if i & 2:
+                    place.amenities.append(cls.amenities[1])
+                place.save()
+        storage.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up objects created in setUpClass"""
+        for obj in cls.states + cls.amenities + [cls.user]:
+            storage.delete(storage.get(type(obj), obj.id))
+
+    def test_same_places(self):
+        """Test the SQL search against the relationship walk"""
+        states = [s.id for s in self.states]
+        cities = [c.id for c in self.cities]
+        amenities = [a.id for a in self.amenities]
+        for body in search_cases.bodies(states, cities, amenities):
+            with self.subTest(body=body):
+                expected = search_cases.walk(storage,
+                                             body.get('states', []),
+                                             body.get('cities', []),
+                                             body.get('amenities', []))
+                storage.close()
+                res = self.app.post('/api/v1/places_search', json=body)
+                self.assertEqual(res.status_code, 200)
+                self.assertEqual(sorted(p['id'] for p in res.json),
+                                 expected)
@@ -1,10 +1,13 @@
 #!/usr/bin/python3
 """Test module for states view"""
+from base64 import urlsafe_b64encode
 import unittest
+from unittest import mock
 from api.v1.app import app
+import api.v1.views
 from models.state import State
 import json
-from models import storage
+from models import storage, storage_t
 
 
 class TestStateView(unittest.TestCase):
@@ -33,6 +36,82 @@ class TestStateView(unittest.TestCase):
                                            for st in json_format])
         storage.delete(state)
 
+    def test_getstates_body(self):
+        """Test that the list built from the objects' JSON fragments holds
+        the same dictionaries as to_dict()"""
+        state = State(name="Nakuru ☀")
+        state.save()
+
+        res = self.app.get('/api/v1/states')
+        json_format = json.loads(str(res.get_data(), encoding="utf-8"))
+
+        self.assertIn(state.to_dict(), json_format)
+        self.assertEqual(len(json_format), storage.count(State))
+        storage.delete(state)
+
+    def test_getstates_pages(self):
+        """Test that limit pages the states in created_at then id order,
+        each page linking to the next one"""
+        states = [State(name="Page {}".format(i)) for i in range(5)]
+        for state in states:
+            state.save()
+        res = self.app.get('/api/v1/states')
+        expected = [st["id"] for st in json.loads(res.get_data())]
+
+        ids = []
+        url = '/api/v1/states?limit=2'
+        while url:
+            res = self.app.get(url)
+            self.assertEqual(res.status_code, 200)
+            page = json.loads(str(res.get_data(), encoding="utf-8"))
+            self.assertLessEqual(len(page), 2)
+            ids.extend(st["id"] for st in page)
+            link = res.headers.get("Link")
+            url = link[link.index("/api"):link.index(">")] if link else None
+        self.assertEqual(ids, expected)
+        self.assertEqual(self.app.get('/api/v1/states?cursor=x').status_code,
+                         400)
+        self.assertEqual(self.app.get('/api/v1/states?limit=0').status_code,
+                         400)
+        for created_at in ("2017-06-14T22:31:03.28525Z",
+                           "2017-06-14T22:31:03.1+0000"):
+            cursor = urlsafe_b64encode(json.dumps(
+                [created_at, "x"]).encode()).decode()
+            res = self.app.get('/api/v1/states?cursor={}'.format(cursor))
+            self.assertEqual(res.status_code, 400)
+        for state in states:
+            storage.delete(storage.get(State, state.id))
+
+    def test_getstates_errors(self):
+        """Test that an error serializing the first chunk of the list
+        answers 500, and that a later one is logged"""
+        states = [State(name="Error {}".format(i)) for i in range(2)]
+        for state in states:
+            state.save()
+        name = "to_dict" if storage_t == "db" else "to_json"
+        method = getattr(State, name)
+
+        def fail(obj):
+            """serializes obj, unless it is the last state"""
+            if obj.id == states[1].id:
+                raise RuntimeError("serialization failed")
+            return method(obj)
+        with mock.patch.object(State, name, autospec=True,
+                               side_effect=fail):
+            app.testing = False
+            try:
+                res = self.app.get('/api/v1/states')
+            finally:
+                app.testing = True
+            self.assertEqual(res.status_code, 500)
+            with mock.patch.object(api.v1.views, "chunk_size", 1), \
+                    self.assertLogs(app.logger, "ERROR"):
+                res = self.app.get('/api/v1/states')
+                self.assertEqual(res.status_code, 200)
+                self.assertRaises(RuntimeError, res.get_data)
+        for state in states:
+            storage.delete(storage.get(State, state.id))
+
     def test_getstate(self):
         """Test that the route /states/<state_id> returns one State object
         by its id."""
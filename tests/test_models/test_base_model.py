@@ -2,6 +2,7 @@
 """Test BaseModel for expected behavior and documentation"""
 from datetime import datetime
 import inspect
+import json
 import models
 import pep8 as pycodestyle
 import time
@@ -166,3 +167,93 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(old_created_at, new_created_at)
         self.assertTrue(mock_storage.new.called)
         self.assertTrue(mock_storage.save.called)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_dirty(self):
+        """Test that new and changed instances are marked dirty, outside of
+        __dict__ and to_dict()"""
+        inst = BaseModel()
+        self.assertTrue(inst._dirty)
+        inst._dirty = False
+        self.assertFalse(inst._dirty)
+        inst.name = "Holberton"
+        self.assertTrue(inst._dirty)
+        self.assertNotIn("_dirty", inst.__dict__)
+        self.assertNotIn("_dirty", inst.to_dict())
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_serialization_cache(self):
+        """Test that to_dict and to_json are cached until a change"""
+        stats = models.base_model.cache_stats
+        inst = BaseModel(name="Holberton")
+        first = inst.to_dict()
+        first["name"] = "changed by the caller"
+        hits = stats["hits"]
+        self.assertEqual(inst.to_dict()["name"], "Holberton")
+        self.assertEqual(stats["hits"], hits + 1)
+        encoded = inst.to_json()
+        self.assertEqual(json.loads(encoded.decode("utf-8")), inst.to_dict())
+        self.assertIs(inst.to_json(), encoded)
+        inst.name = "School"
+        self.assertEqual(inst.to_dict()["name"], "School")
+        self.assertIn(b'"name":"School"', inst.to_json())
+        self.assertNotIn("_cache", inst.to_dict())
+
+    def test_parse_time(self):
+        """Test the fast parse of timestamps and its strptime fallback"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        parse_time = models.base_model.parse_time
+        for value in ("2017-06-14T22:31:03.285259", "2030-01-01T00:00:00.0",
+                      "0999-12-31T23:59:59.000001"):
+            self.assertEqual(parse_time(value),
+                             datetime.strptime(value, t_format))
+        for value in ("2017-06-14 22:31:03.285259", "2017-06-14T22:31:03",
+                      "2017-13-14T22:31:03.285259", "not a date",
+                      "2017-06-14T22:31:03.1+0000",
+                      "2017-06-14T22:31:03.28525Z"):
+            self.assertRaises(ValueError, parse_time, value)
+
+    def test_format_time(self):
+        """Test that timestamps are formatted as strftime does"""
+        t_format = "%Y-%m-%dT%H:%M:%S.%f"
+        format_time = models.base_model.format_time
+        for value in (datetime(2017, 6, 14, 22, 31, 3, 285259),
+                      datetime(2030, 1, 1), datetime(999, 12, 31, 1)):
+            self.assertEqual(format_time(value), value.strftime(t_format))
+
+
+@unittest.skipIf(not models.base_model.compact, "not testing compact models")
+class TestCompactModel(unittest.TestCase):
+    """Test the models of file storage in compact mode"""
+    def test_slots(self):
+        """Test that declared attributes live in slots, not a dictionary"""
+        from models.place import Place
+        place = Place(name="Loft", color="blue")
+        self.assertIn("name", Place.__slots__)
+        self.assertEqual(place.number_rooms, 0)
+        self.assertEqual(place.color, "blue")
+        self.assertEqual(place.__dict__["name"], "Loft")
+        self.assertNotIn("number_rooms", place.__dict__)
+        self.assertEqual(place._extra, {"color": "blue"})
+
+    def test_to_dict(self):
+        """Test that to_dict and __str__ show the attributes set"""
+        from models.place import Place
+        place = Place(name="Loft", color="blue")
+        new_d = place.to_dict()
+        self.assertEqual(Place(**new_d).to_dict(), new_d)
+        self.assertEqual(sorted(new_d), ["__class__", "color", "created_at",
+                                         "id", "name", "updated_at"])
+        self.assertIn("'color': 'blue'", str(place))
+
+    def test_dict_view(self):
+        """Test writing to and deleting from the __dict__ view"""
+        from models.user import User
+        user = User()
+        user.password = "pwd"
+        self.assertEqual(len(user.password), 32)
+        user.__dict__["first_name"] = "Betty"
+        self.assertEqual(user.first_name, "Betty")
+        del user.__dict__["first_name"]
+        self.assertEqual(user.first_name, "")
+        self.assertRaises(AttributeError, getattr, user, "missing")
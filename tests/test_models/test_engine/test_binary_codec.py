@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+"""
+Contains the TestBinaryCodecDocs and TestBinaryCodec classes
+"""
+
+from datetime import datetime
+import io
+import json
+import models
+from models.engine import binary_codec
+from models.place import Place
+from models.state import State
+from models.user import User
+import os
+import pep8 as pycodestyle
+import shutil
+import tempfile
+import unittest
+
+
+class TestBinaryCodecDocs(unittest.TestCase):
+    """Tests to check the documentation and style of binary_codec"""
+    def test_pep8_conformance_binary_codec(self):
+        """Test that models/engine/binary_codec.py conforms to PEP8."""
+        pep8s = pycodestyle.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/binary_codec.py',
+                                    'tests/test_models/test_engine/\
+test_binary_codec.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_binary_codec_module_docstring(self):
+        """Test for the binary_codec.py module docstring"""
+        self.assertIsNot(binary_codec.__doc__, None,
+                         "binary_codec.py needs a docstring")
+        self.assertTrue(len(binary_codec.__doc__) >= 1,
+                        "binary_codec.py needs a docstring")
+
+
+class TestBinaryCodec(unittest.TestCase):
+    """Test the binary snapshot format"""
+    def setUp(self):
+        """Builds records of several classes and attribute types"""
+        state = State(name="Californie ☀")
+        place = Place(name="Loft", number_rooms=3, latitude=37.77,
+                      amenity_ids=["a", "b"], description=None)
+        user = User(email="a@b.c", first_name="Betty")
+        self.objs = [state, place, user]
+        self.records = {}
+        for obj in self.objs:
+            self.records[obj.__class__.__name__ + "." + obj.id] = \
+                obj.to_dict()
+
+    def round_trip(self, records):
+        """Returns records written then read back by the codec"""
+        f = io.BytesIO()
+        binary_codec.dump(records, f)
+        f.seek(0)
+        return binary_codec.load(f)
+
+    def test_round_trip(self):
+        """Test that records come back with datetime timestamps"""
+        loaded = self.round_trip(self.records)
+        self.assertEqual(list(loaded), list(self.records))
+        for obj in self.objs:
+            record = loaded[obj.__class__.__name__ + "." + obj.id]
+            self.assertEqual(record["created_at"], obj.created_at)
+            self.assertIs(type(record["updated_at"]), datetime)
+            expected = obj.to_dict()
+            del expected["created_at"], expected["updated_at"]
+            del record["created_at"], record["updated_at"]
+            self.assertEqual(record, expected)
+
+    def test_missing_attributes(self):
+        """Test that attributes set on some objects of a class only are
+        not added to the others"""
+        other = State(name="Nevada", capital="Carson City")
+        self.records["State." + other.id] = other.to_dict()
+        loaded = self.round_trip(self.records)
+        self.assertEqual(loaded["State." + other.id]["capital"],
+                         "Carson City")
+        self.assertNotIn("capital", loaded["State." + self.objs[0].id])
+
+    def test_surrogates(self):
+        """Test that strings holding lone surrogates round-trip"""
+        state = State(name="\ud800x", code="\udc00")
+        other = State(name="\udc00", code="\ud800")
+        records = {"State." + state.id: state.to_dict(),
+                   "State." + other.id: other.to_dict()}
+        loaded = self.round_trip(records)
+        self.assertEqual(loaded["State." + state.id]["name"], "\ud800x")
+        self.assertEqual(loaded["State." + other.id]["name"], "\udc00")
+        self.assertEqual(loaded["State." + other.id]["code"], "\ud800")
+
+    def test_model_from_record(self):
+        """Test that models are rebuilt from binary records"""
+        loaded = self.round_trip(self.records)
+        place = Place(**loaded["Place." + self.objs[1].id])
+        self.assertEqual(place.to_dict(), self.objs[1].to_dict())
+
+    def test_convert(self):
+        """Test the conversion between JSON and binary snapshots"""
+        tmp = tempfile.mkdtemp()
+        try:
+            paths = [os.path.join(tmp, name)
+                     for name in ("a.json", "b.bin", "c.json")]
+            with open(paths[0], "w") as f:
+                json.dump(self.records, f, indent=4)
+            binary_codec.convert(paths[0], paths[1])
+            binary_codec.convert(paths[1], paths[2], to_binary=False)
+            with open(paths[2]) as f:
+                self.assertEqual(json.load(f), self.records)
+            self.assertLess(os.path.getsize(paths[1]),
+                            os.path.getsize(paths[0]))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_not_a_snapshot(self):
+        """Test that a file of another format is rejected"""
+        self.assertRaises(ValueError, binary_codec.load,
+                          io.BytesIO(b"{}"))
@@ -18,6 +18,7 @@ import json
 import os
 import pep8 as pycodestyle
 import unittest
+from unittest import mock
 
 DBStorage = db_storage.DBStorage
 classes = {"Amenity": Amenity, "City": City, "Place": Place,
@@ -114,11 +115,154 @@ class TestDBStorage(unittest.TestCase):
         self.assertEqual(storage.count(), 3, "Total objects in db not 3")
         self.assertEqual(storage.count(Amenity), 2, "Amenity objects not 2")
         self.assertEqual(storage.count(User), 1, "User objects not 1")
+        self.assertEqual(storage.count("Amenity"), 2)
+        self.assertEqual(storage.count("Foo"), 0)
+        self.assertEqual(storage.counts(), {"Amenity": 2, "City": 0,
+                                            "Place": 0, "Review": 0,
+                                            "State": 0, "User": 1})
 
         storage.delete(ameni)
         storage.delete(user)
         storage.delete(ameni2)
 
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_counts_ttl(self):
+        """Test that counts() answers from its last query for the TTL, and
+        queries again after a commit"""
+        storage = models.storage
+        save = storage._DBStorage__counts_ttl
+        storage._DBStorage__counts_ttl = 3600
+        try:
+            before = storage.counts()["State"]
+            storage._DBStorage__counts = (
+                storage._DBStorage__counts[0],
+                dict(storage._DBStorage__counts[1], State=-1))
+            self.assertEqual(storage.counts()["State"], -1)
+            state = State(name='Counted State')
+            state.save()
+            self.assertEqual(storage.counts()["State"], before + 1)
+            storage.delete(state)
+            self.assertEqual(storage.counts()["State"], before)
+        finally:
+            storage._DBStorage__counts_ttl = save
+            storage._DBStorage__counts = None
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_iter_all(self):
+        """Test that iter_all yields the rows of the class asked for, over
+        several batches"""
+        storage = models.storage
+        states = [State(name='Iterated State {}'.format(i))
+                  for i in range(5)]
+        for state in states:
+            storage.new(state)
+        storage.save()
+        ids = [obj.id for obj in storage.iter_all(State, batch_size=2)]
+        self.assertCountEqual(ids, [state.id for state in states])
+        self.assertEqual(len(list(storage.iter_all("State"))), 5)
+        self.assertEqual(len(list(storage.iter_all())), storage.count())
+        self.assertEqual(storage.all(State).keys(),
+                         {"State." + state.id for state in states})
+        for state in states:
+            storage.delete(storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_pool_stats(self):
+        """Test that pool_stats reports the checkouts of the pool"""
+        storage = models.storage
+        if storage.pool_stats() is None:
+            self.skipTest("database without a queue pool")
+        storage.count()
+        stats = storage.pool_stats()
+        self.assertGreater(stats["checkouts"], 0)
+        self.assertGreaterEqual(stats["wait_max"], 0)
+        self.assertLessEqual(stats["checked_out"],
+                             stats["size"] + stats["overflow"])
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_pool_options(self):
+        """Test that the HBNB_MYSQL_POOL_* variables configure the pool"""
+        env = {"HBNB_ENV": "", "HBNB_MYSQL_POOL_SIZE": "2",
+               "HBNB_MYSQL_MAX_OVERFLOW": "1",
+               "HBNB_MYSQL_POOL_TIMEOUT": "0.5",
+               "HBNB_MYSQL_POOL_PRE_PING": "0"}
+        with mock.patch.dict(os.environ, env):
+            storage = DBStorage()
+        engine = storage._DBStorage__engine
+        if not isinstance(engine.pool, db_storage.TimedQueuePool):
+            self.skipTest("database without a queue pool")
+        self.assertEqual(engine.pool.size(), 2)
+        self.assertEqual(engine.pool._max_overflow, 1)
+        self.assertEqual(engine.pool._timeout, 0.5)
+        self.assertFalse(engine.pool._pre_ping)
+        engine.dispose()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_bulk_new(self):
+        """Test that bulk_new inserts parents before children, in chunks"""
+        storage = models.storage
+        state = State(name='Bulk State')
+        cities = [City(name='Bulk City {}'.format(i), state_id=state.id)
+                  for i in range(3)]
+        before = storage.count(City)
+        self.assertEqual(storage.bulk_new(cities + [state], chunk_size=2), 4)
+        self.assertEqual(storage.count(City), before + 3)
+        storage.close()
+        self.assertEqual(len(storage.get(State, state.id).cities), 3)
+        storage.close()
+        storage.delete(storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_bulk_update(self):
+        """Test that bulk_update sets the attributes given by id, skipping
+        missing ids, on the objects the session already holds too"""
+        storage = models.storage
+        states = [State(name='Old State {}'.format(i)) for i in range(3)]
+        storage.bulk_new(states)
+        loaded = storage.get(State, states[0].id)
+        updated_at = loaded.updated_at
+        rows = [{"id": states[0].id, "name": "New State 0"},
+                {"id": "missing", "name": "New State"},
+                {"id": states[2].id, "name": "New State 2"}]
+        self.assertEqual(storage.bulk_update(State, rows, chunk_size=1), 2)
+        self.assertEqual(loaded.name, "New State 0")
+        self.assertGreater(loaded.updated_at, updated_at)
+        self.assertEqual([storage.get(State, state.id).name
+                          for state in states],
+                         ["New State 0", "Old State 1", "New State 2"])
+        with self.assertRaises(KeyError):
+            storage.bulk_update(State, [{"id": states[0].id, "size": 1}])
+        user = User(email="bulk@hbnb.io", password="old")
+        storage.bulk_new([user])
+        storage.bulk_update(User, [{"id": user.id, "password": "new"}])
+        self.assertEqual(storage.get(User, user.id).password,
+                         User(password="new").password)
+        storage.delete(storage.get(User, user.id))
+        storage.close()
+        for state in states:
+            storage.delete(storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_page(self):
+        """Test that page returns the rows in created_at then id order from
+        a cursor"""
+        storage = models.storage
+        state = State(name='Paged State')
+        start = datetime(2020, 1, 1)
+        cities = [City(name='Paged City', state_id=state.id,
+                       created_at=start.replace(second=i // 2))
+                  for i in range(6)]
+        storage.bulk_new([state] + cities)
+        order = [city.id for city in sorted(
+            cities, key=lambda city: (city.created_at, city.id))]
+        page = storage.page(City, 4, fk="state_id", value=state.id)
+        self.assertEqual([city.id for city in page], order[:4])
+        after = (page[1].created_at, page[1].id)
+        page = storage.page(City, 10, after, "state_id", state.id)
+        self.assertEqual([city.id for city in page], order[2:])
+        storage.close()
+        storage.delete(storage.get(State, state.id))
+
     @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
     def test_get(self):
         """Test that get correctly retrieves an object, based on its id."""
@@ -128,3 +272,94 @@ class TestDBStorage(unittest.TestCase):
 
         self.assertEqual(models.storage.get(State, state.id), state)
         models.storage.delete(state)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_get_identity_map(self):
+        """Test that get returns the object the session already holds"""
+        storage = models.storage
+        state = State(name='Mapped State')
+        state.save()
+        storage.close()
+        first = storage.get(State, state.id)
+        self.assertIs(storage.get(State, state.id), first)
+        self.assertIsNone(storage.get(State, None))
+        self.assertIsNone(storage.get(State, 'missing'))
+        storage.delete(first)
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_get_cache(self):
+        """Test that get answers from the cache across sessions, and that
+        a commit changing an object drops its cached copy"""
+        storage = models.storage
+        save = storage._DBStorage__cache_size
+        storage._DBStorage__cache_size = 2
+        try:
+            state = State(name='Cached State')
+            state.save()
+            storage.close()
+            storage.get(State, state.id)
+            self.assertIn("State." + state.id, storage._DBStorage__cache)
+            storage.close()
+            cached = storage.get(State, state.id)
+            self.assertEqual(cached.name, 'Cached State')
+            cached.name = 'Renamed State'
+            cached.save()
+            self.assertNotIn("State." + state.id,
+                             storage._DBStorage__cache)
+            storage.close()
+            self.assertEqual(storage.get(State, state.id).name,
+                             'Renamed State')
+            others = [State(name='Other State') for i in range(2)]
+            for other in others:
+                other.save()
+            storage.close()
+            for obj in [state] + others:
+                storage.get(State, obj.id)
+            self.assertEqual(list(storage._DBStorage__cache),
+                             ["State." + obj.id for obj in others])
+            storage.close()
+            for obj in [state] + others:
+                storage.delete(storage.get(State, obj.id))
+            self.assertEqual(len(storage._DBStorage__cache), 0)
+        finally:
+            storage._DBStorage__cache_size = save
+            storage._DBStorage__cache.clear()
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_get_many(self):
+        """Test that get_many returns the objects in the order of the ids,
+        skipping missing ones"""
+        storage = models.storage
+        states = [State(name='Many State {}'.format(i)) for i in range(3)]
+        for state in states:
+            storage.new(state)
+        storage.save()
+        storage.close()
+        ids = [states[2].id, 'missing', states[0].id, states[2].id]
+        self.assertEqual([obj.id for obj in storage.get_many(State, ids)],
+                         [states[2].id, states[0].id, states[2].id])
+        self.assertEqual(storage.get_many(State, []), [])
+        storage.close()
+        for state in states:
+            storage.delete(storage.get(State, state.id))
+
+    @unittest.skipIf(models.storage_t != 'db', "not testing db storage")
+    def test_eager(self):
+        """Test that get and all load the relationship paths asked for with
+        each loader strategy"""
+        storage = models.storage
+        state = State(name='Eager State')
+        state.save()
+        city = City(name='Eager City', state_id=state.id)
+        city.save()
+        for loader in ("selectin", "joined", "subquery"):
+            storage.close()
+            obj = storage.get(State, state.id, eager=("cities.places",),
+                              loader=loader)
+            self.assertIn("cities", obj.__dict__)
+            self.assertIn("places", obj.cities[0].__dict__)
+            storage.close()
+            objs = storage.all(State, eager=("cities",), loader=loader)
+            self.assertIn("cities", objs["State." + state.id].__dict__)
+        storage.close()
+        storage.delete(storage.get(State, state.id))
@@ -3,7 +3,7 @@
 Contains the TestFileStorageDocs classes
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta
 import inspect
 import models
 from models.engine import file_storage
@@ -17,7 +17,11 @@ from models.user import User
 import json
 import os
 import pep8 as pycodestyle
+import shutil
+import tempfile
+import time
 import unittest
+from unittest import mock
 
 FileStorage = file_storage.FileStorage
 classes = {"Amenity": Amenity, "BaseModel": BaseModel, "City": City,
@@ -134,16 +138,554 @@ class TestFileStorage(unittest.TestCase):
         """Tests that count returns the number of objects in storage"""
         storage = FileStorage()
         FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__classes = {}
         self.assertEqual(storage.count(), 0)
 
         user = User()
         user2 = User()
         city = City()
 
-        FileStorage._FileStorage__objects['User.{}'.format(user.id)] = user
-        FileStorage._FileStorage__objects['User.{}'.format(user2.id)] = user2
-        FileStorage._FileStorage__objects['City.{}'.format(city.id)] = city
+        storage.new(user)
+        storage.new(user2)
+        storage.new(city)
 
         self.assertEqual(storage.count(), 3, "Total count did not return 3")
         self.assertEqual(storage.count(User), 2, "count of User objects not 2")
         self.assertEqual(storage.count(City), 1, "count of City objects not 1")
+        counts = storage.counts()
+        self.assertEqual(counts["User"], 2)
+        self.assertEqual(counts["City"], 1)
+        self.assertEqual(counts["Place"], 0)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_bulk(self):
+        """Tests that bulk_new and bulk_update save once"""
+        storage = FileStorage()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__classes = {}
+        users = [User(first_name="Betty") for i in range(3)]
+        with mock.patch.object(FileStorage, "save") as save:
+            self.assertEqual(storage.bulk_new(users), 3)
+            self.assertEqual(storage.count(User), 3)
+            rows = [{"id": users[1].id, "first_name": "Bob"},
+                    {"id": "missing", "first_name": "Al"}]
+            self.assertEqual(storage.bulk_update(User, rows), 1)
+            with self.assertRaises(KeyError):
+                storage.bulk_update(User, [{"id": users[0].id, "size": 1}])
+        self.assertEqual(save.call_count, 2)
+        self.assertEqual(users[0].first_name, "Betty")
+        self.assertEqual([user.first_name for user in users],
+                         ["Betty", "Bob", "Betty"])
+        self.assertGreater(users[1].updated_at, users[1].created_at)
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_page(self):
+        """Tests that page returns the objects in created_at then id order
+        from a cursor, following objects stored and removed since"""
+        storage = FileStorage()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__classes = {}
+        FileStorage._FileStorage__indexes = {}
+        FileStorage._FileStorage__order = {}
+        FileStorage._FileStorage__order_added = {}
+        start = datetime(2020, 1, 1)
+        cities = [City(state_id="s" if i % 2 else "t",
+                       created_at=start + timedelta(seconds=i // 2))
+                  for i in range(6)]
+        for city in cities:
+            storage.new(city)
+        order = sorted(cities, key=lambda city: (city.created_at, city.id))
+        self.assertEqual(storage.page(City, 4), order[:4])
+        after = (order[1].created_at, order[1].id)
+        self.assertEqual(storage.page(City, 2, after), order[2:4])
+        storage.delete(order[2])
+        late = City(state_id="s")
+        storage.new(late)
+        self.assertEqual(storage.page(City, 10, after), order[3:] + [late])
+        self.assertEqual(storage.page(City, 10, fk="state_id", value="s"),
+                         [city for city in order + [late]
+                          if city.state_id == "s" and city is not order[2]])
+        order[0].created_at = late.created_at + timedelta(seconds=1)
+        self.assertEqual(storage.page(City, 10)[-1], order[0])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_iter_all(self):
+        """Tests that iter_all yields the objects all() returns"""
+        storage = FileStorage()
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__classes = {}
+        user = User()
+        city = City()
+        storage.new(user)
+        storage.new(city)
+        self.assertEqual(list(storage.iter_all(User, batch_size=1)), [user])
+        self.assertEqual(list(storage.iter_all("City")), [city])
+        self.assertCountEqual(storage.iter_all(), [user, city])
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_related(self):
+        """Tests that related() follows new(), delete() and changes of the
+        foreign key attribute"""
+        storage = FileStorage()
+        save = FileStorage._FileStorage__objects
+        FileStorage._FileStorage__objects = {}
+        state = State()
+        other = State()
+        city = City(state_id=state.id)
+        storage.new(city)
+        self.assertEqual(storage.related(City, "state_id", state.id), [city])
+        self.assertEqual(storage.related("City", "state_id", state.id),
+                         [city])
+        city.state_id = other.id
+        self.assertEqual(storage.related(City, "state_id", state.id), [])
+        self.assertEqual(storage.related(City, "state_id", other.id), [city])
+        storage.delete(city)
+        self.assertEqual(storage.related(City, "state_id", other.id), [])
+        place = Place()
+        storage.new(place)
+        self.assertIn(place, storage.related(Place, "city_id", ""))
+        place.city_id = "abc"
+        storage.delete(place)
+        self.assertNotIn(place, storage.related(Place, "city_id", ""))
+        self.assertEqual(storage.related(Place, "city_id", "abc"), [])
+        FileStorage._FileStorage__objects = save
+
+    @unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+    def test_all_cls(self):
+        """Tests that all(cls) is a read-only live view of one class"""
+        storage = FileStorage()
+        user = User()
+        storage.new(user)
+        users = storage.all(User)
+        self.assertIs(users["User." + user.id], user)
+        self.assertIs(storage.all("User")["User." + user.id], user)
+        self.assertNotIn("User." + user.id, storage.all(City))
+        for obj in users.values():
+            self.assertIs(type(obj), User)
+        with self.assertRaises(TypeError):
+            users["User.fake"] = user
+        user2 = User()
+        storage.new(user2)
+        self.assertIn("User." + user2.id, users)
+        self.assertEqual(len(users), storage.count(User))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class FileStorageCase(unittest.TestCase):
+    """Base of the tests of a mode of FileStorage: every test runs against
+    files in an empty directory, with every attribute of FileStorage back
+    to its default value but the ones of the mode tested"""
+    # dictionary - FileStorage attributes set by the mode tested
+    mode = {}
+
+    def setUp(self):
+        """Points an empty storage to an empty directory, in the mode"""
+        self.saved = dict(vars(FileStorage))
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "file.json")
+        attrs = {"codec": "json", "file_path": self.path,
+                 "journal_path": self.path + ".log", "journal": False,
+                 "journal_max": 4 * 1024 * 1024, "lazy": False,
+                 "write_mode": "sync", "flush_interval": 1,
+                 "flush_threshold": 100, "durability": "file",
+                 "shards_path": None}
+        attrs.update(self.mode)
+        for name, value in attrs.items():
+            setattr(FileStorage, "_FileStorage__" + name, value)
+        self.empty()
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """Restores the storage attributes, leaving a background writer
+        started by a test registered"""
+        for key, value in self.saved.items():
+            if key.startswith("_FileStorage__") and "flusher" not in key:
+                setattr(FileStorage, key, value)
+        shutil.rmtree(self.tmp)
+
+    def empty(self):
+        """Forgets every object, record and file read or written"""
+        for name in ("objects", "classes", "indexes", "listed", "pending",
+                     "versions", "records", "record_indexes",
+                     "shards_signatures", "order", "order_added"):
+            setattr(FileStorage, "_FileStorage__" + name, {})
+        for name in ("shards_loaded", "shards_touched"):
+            setattr(FileStorage, "_FileStorage__" + name, set())
+        FileStorage._FileStorage__signature = None
+        FileStorage._FileStorage__dirty = 0
+        FileStorage._FileStorage__journal_skipped = 0
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageSave(FileStorageCase):
+    """Test the writes of FileStorage in its default mode"""
+    def test_save_serializes_dirty(self):
+        """Tests that save only serializes the objects that changed since
+        they were last written, writing the record they cache"""
+        storage = self.storage
+        state = State(name="California")
+        state2 = State(name="Nevada")
+        storage.new(state)
+        storage.new(state2)
+        storage.save()
+        self.assertFalse(state._dirty)
+        state.name = "Arizona"
+        self.assertTrue(state._dirty)
+        stats = models.base_model.cache_stats
+        misses = stats["misses"]
+        storage.save()
+        self.assertEqual(stats["misses"], misses + 1)
+        self.assertEqual(state.to_dict()["name"], "Arizona")
+        self.assertEqual(stats["misses"], misses + 1)
+        with open(self.path) as f:
+            records = json.load(f)
+        self.assertEqual(records["State." + state.id]["name"], "Arizona")
+        self.assertEqual(records["State." + state2.id]["name"], "Nevada")
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageJournal(FileStorageCase):
+    """Test the journaled mode of the FileStorage class"""
+    mode = {"journal": True}
+
+    def reloaded(self):
+        """Returns the objects read back from disk by a fresh storage"""
+        self.empty()
+        self.storage.reload()
+        return self.storage.all()
+
+    def test_save_appends(self):
+        """Test that save appends one record per change to the journal"""
+        state = State(name="California")
+        state.save()
+        user = User(email="a@b.c")
+        user.save()
+        self.assertFalse(os.path.exists(self.path))
+        with open(self.path + ".log") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([r["op"] for r in records], ["upsert", "upsert"])
+        self.assertEqual(records[0]["key"], "State." + state.id)
+        self.assertEqual(records[0]["obj"], state.to_dict())
+        self.storage.delete(state)
+        with open(self.path + ".log") as f:
+            self.assertEqual(len(f.readlines()), 3)
+        objs = self.reloaded()
+        self.assertEqual(list(objs), ["User." + user.id])
+        self.assertEqual(objs["User." + user.id].email, "a@b.c")
+
+    def test_compact(self):
+        """Test that a journal past its size limit becomes the snapshot"""
+        FileStorage._FileStorage__journal_max = 1
+        state = State(name="California")
+        state.save()
+        self.assertEqual(os.path.getsize(self.path + ".log"), 0)
+        with open(self.path) as f:
+            self.assertEqual(json.load(f),
+                             {"State." + state.id: state.to_dict()})
+        self.assertEqual(list(self.reloaded()), ["State." + state.id])
+
+    def test_torn_record(self):
+        """Test that a record cut short by a crash is ignored on reload
+        and cut off by the next save"""
+        state = State(name="California")
+        state.save()
+        with open(self.path + ".log", "a") as f:
+            f.write('{"op":"upsert","key":"State.')
+        size = os.path.getsize(self.path + ".log")
+        self.assertEqual(list(self.reloaded()), ["State." + state.id])
+        self.assertEqual(os.path.getsize(self.path + ".log"), size)
+        city = City(name="Fremont", state_id=state.id)
+        city.save()
+        with open(self.path + ".log") as f:
+            self.assertEqual(len([json.loads(line) for line in f]), 2)
+        self.assertEqual(sorted(self.reloaded()),
+                         sorted(["State." + state.id, "City." + city.id]))
+
+    def test_damaged_record(self):
+        """Test that a damaged record is skipped on reload, keeping the
+        records after it and the journal as it is"""
+        states = [State(name="State {}".format(i)) for i in range(3)]
+        for state in states:
+            state.save()
+        with open(self.path + ".log") as f:
+            lines = f.readlines()
+        lines[1] = lines[1][:20] + "\n"
+        with open(self.path + ".log", "w") as f:
+            f.writelines(lines)
+        self.assertEqual(sorted(self.reloaded()),
+                         sorted(["State." + states[0].id,
+                                 "State." + states[2].id]))
+        self.assertEqual(FileStorage._FileStorage__journal_skipped, 1)
+        with open(self.path + ".log") as f:
+            self.assertEqual(f.readlines(), lines)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageReload(FileStorageCase):
+    """Test that FileStorage.reload only reads what changed on disk"""
+    def test_unchanged_file(self):
+        """Test that reload leaves objects alone while the file is as it
+        was last written"""
+        state = State(name="California")
+        state.save()
+        state.name = "Nevada"
+        self.storage.close()
+        self.assertIs(self.storage.get(State, state.id), state)
+        self.assertEqual(state.name, "Nevada")
+
+    def test_changed_records(self):
+        """Test that reload only rebuilds the records changed on disk"""
+        state = State(name="California")
+        state.save()
+        user = User(email="a@b.c")
+        user.save()
+        with open(self.path) as f:
+            records = json.load(f)
+        records["State." + state.id]["name"] = "Nevada"
+        records["State." + state.id]["updated_at"] = "2030-01-01T00:00:00.0"
+        with open(self.path, "w") as f:
+            json.dump(records, f)
+        self.storage.reload()
+        self.assertIs(self.storage.get(User, user.id), user)
+        reloaded = self.storage.get(State, state.id)
+        self.assertIsNot(reloaded, state)
+        self.assertEqual(reloaded.name, "Nevada")
+
+    def test_binary_codec(self):
+        """Test that objects saved in the binary format load back, lone
+        surrogates included"""
+        FileStorage._FileStorage__codec = "binary"
+        state = State(name="California \ud800")
+        state.save()
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(4), b"HBNB")
+        self.empty()
+        self.storage.reload()
+        reloaded = self.storage.get(State, state.id)
+        self.assertEqual(reloaded.to_dict(), state.to_dict())
+        reloaded.name = "Nevada"
+        reloaded.save()
+        FileStorage._FileStorage__codec = "json"
+        self.storage.save()
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["State." + state.id],
+                             reloaded.to_dict())
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageWriteBehind(FileStorageCase):
+    """Test the write-behind mode of the FileStorage class"""
+    mode = {"write_mode": "behind", "flush_interval": 3600,
+            "flush_threshold": 3}
+
+    def tearDown(self):
+        """Writes what is left and restores the storage attributes"""
+        self.storage.flush()
+        super().tearDown()
+
+    def test_flush(self):
+        """Test that save defers the write until flush is called"""
+        state = State(name="California")
+        state.save()
+        self.assertFalse(os.path.exists(self.path))
+        self.storage.flush()
+        with open(self.path) as f:
+            self.assertIn("State." + state.id, json.load(f))
+
+    def test_threshold(self):
+        """Test that enough saves wake the background thread up"""
+        for i in range(3):
+            State(name="state{}".format(i)).save()
+        for i in range(100):
+            if os.path.exists(self.path):
+                break
+            time.sleep(0.05)
+        with self.storage._FileStorage__lock:
+            with open(self.path) as f:
+                self.assertEqual(len(json.load(f)), len(self.storage.all()))
+        self.assertEqual(self.storage._FileStorage__dirty, 0)
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageShards(FileStorageCase):
+    """Test the FileStorage class with one file per class"""
+    def setUp(self):
+        """Points the storage to an empty directory of class files"""
+        super().setUp()
+        FileStorage._FileStorage__shards_path = self.tmp
+
+    def test_one_file_per_class(self):
+        """Test that save writes one file per class, skipping the files
+        of untouched classes"""
+        state = State(name="California")
+        state.save()
+        user = User(email="a@b.c")
+        user.save()
+        self.assertEqual(sorted(os.listdir(self.tmp)),
+                         ["State.json", "User.json"])
+        with open(os.path.join(self.tmp, "State.json")) as f:
+            self.assertEqual(json.load(f),
+                             {"State." + state.id: state.to_dict()})
+        os.remove(os.path.join(self.tmp, "User.json"))
+        state.name = "Nevada"
+        self.storage.save()
+        self.assertEqual(os.listdir(self.tmp), ["State.json"])
+        self.storage.delete(user)
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "User.json")))
+
+    def test_lazy_load(self):
+        """Test that a class file is only read when its class is used"""
+        state = State(name="California")
+        state.save()
+        user = User(email="a@b.c")
+        user.save()
+        self.empty()
+        self.storage.reload()
+        self.assertEqual(self.storage._FileStorage__shards_loaded, set())
+        self.assertEqual(self.storage.get(State, state.id).name,
+                         "California")
+        self.assertEqual(self.storage._FileStorage__shards_loaded,
+                         {"State"})
+        self.assertEqual(self.storage.count(User), 1)
+        self.assertIn("User." + user.id, self.storage.all())
+        self.assertEqual(self.storage._FileStorage__shards_loaded,
+                         set(file_storage.classes))
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageDurability(FileStorageCase):
+    """Test that FileStorage replaces its files atomically"""
+    def test_levels(self):
+        """Test the number of fsync calls made by each durability level"""
+        for level, calls in (("none", 0), ("file", 1), ("dir", 2)):
+            with self.subTest(level=level):
+                FileStorage._FileStorage__durability = level
+                with mock.patch("os.fsync") as fsync:
+                    State(name=level).save()
+                self.assertEqual(fsync.call_count, calls)
+                self.assertEqual(os.listdir(self.tmp), ["file.json"])
+
+    def test_failed_write(self):
+        """Test that a write failing halfway leaves the file as it was"""
+        state = State(name="California")
+        state.save()
+        with open(self.path) as f:
+            before = f.read()
+        state.name = object()
+        self.assertRaises(TypeError, self.storage.save)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), before)
+        self.assertEqual(os.listdir(self.tmp), ["file.json"])
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestFileStorageLazy(FileStorageCase):
+    """Test the FileStorage class loading records lazily"""
+    mode = {"lazy": True}
+
+    def setUp(self):
+        """Saves a state with a city and a place, then forgets them"""
+        super().setUp()
+        self.state = State(name="California")
+        self.city = City(name="San Francisco", state_id=self.state.id)
+        self.place = Place(name="Loft", city_id=self.city.id, user_id="u",
+                           amenity_ids=["a1", "a2"])
+        for obj in (self.state, self.city, self.place):
+            self.storage.new(obj)
+        self.storage.save()
+        self.empty()
+        self.storage.reload()
+
+    def objects(self):
+        """Returns the objects built so far"""
+        return FileStorage._FileStorage__objects
+
+    def test_reload_builds_nothing(self):
+        """Test that reload keeps records without building objects"""
+        self.assertEqual(self.objects(), {})
+        self.assertEqual(self.storage.count(), 3)
+        self.assertEqual(self.storage.count(City), 1)
+        self.assertEqual(self.objects(), {})
+
+    def test_get(self):
+        """Test that get builds one object, once"""
+        state = self.storage.get(State, self.state.id)
+        self.assertEqual(state.to_dict(), self.state.to_dict())
+        self.assertEqual(list(self.objects()), ["State." + self.state.id])
+        self.assertIs(self.storage.get(State, self.state.id), state)
+        self.assertIsNone(self.storage.get(State, "missing"))
+
+    def test_get_many(self):
+        """Test that get_many builds only the objects asked for, returned
+        in the order of the ids"""
+        ids = [self.place.id, "missing", self.place.id]
+        places = self.storage.get_many(Place, ids)
+        self.assertEqual([place.id for place in places], [self.place.id] * 2)
+        self.assertEqual(list(self.objects()), ["Place." + self.place.id])
+        self.assertIs(places[0], self.storage.get(Place, self.place.id))
+        self.assertEqual(self.storage.get_many(State, []), [])
+        self.assertEqual(self.storage.get_many(None, [self.state.id]), [])
+
+    def test_page(self):
+        """Test that page builds only the objects of the page"""
+        self.assertEqual([city.id for city in self.storage.page(City, 5)],
+                         [self.city.id])
+        self.assertEqual(list(self.objects()), ["City." + self.city.id])
+        places = self.storage.page(Place, 5, fk="city_id", value=self.city.id)
+        self.assertEqual([place.id for place in places], [self.place.id])
+
+    def test_relationships(self):
+        """Test that relationships build only the related objects"""
+        state = self.storage.get(State, self.state.id)
+        cities = state.cities
+        self.assertEqual([city.id for city in cities], [self.city.id])
+        self.assertEqual(len(self.objects()), 2)
+        self.assertIs(self.storage.get(City, self.city.id), cities[0])
+        self.assertEqual(cities[0].places[0].id, self.place.id)
+
+    def test_related_keys(self):
+        """Test that related_keys finds records without building them"""
+        key = "Place." + self.place.id
+        self.assertEqual(self.storage.related_keys(Place, "amenity_ids",
+                                                   "a2"), {key})
+        self.assertEqual(self.storage.related_keys(Place, "city_id",
+                                                   self.city.id), {key})
+        self.assertEqual(self.objects(), {})
+        place = self.storage.get(Place, self.place.id)
+        place.amenity_ids = ["a1"]
+        self.assertEqual(self.storage.related_keys(Place, "amenity_ids",
+                                                   "a2"), set())
+
+    def test_all(self):
+        """Test that all builds the objects of the class asked for"""
+        self.assertEqual(list(self.storage.all(City)),
+                         ["City." + self.city.id])
+        self.assertEqual(len(self.objects()), 1)
+        self.assertEqual(len(self.storage.all()), 3)
+        self.assertEqual(FileStorage._FileStorage__records,
+                         {"State": {}, "City": {}, "Place": {}})
+
+    def test_save_keeps_records(self):
+        """Test that saving writes the records never accessed as read"""
+        state = self.storage.get(State, self.state.id)
+        state.name = "Nevada"
+        self.storage.save()
+        with open(self.path) as f:
+            records = json.load(f)
+        self.assertEqual(records["State." + state.id]["name"], "Nevada")
+        self.assertEqual(records["Place." + self.place.id],
+                         self.place.to_dict())
+
+    def test_new_and_delete(self):
+        """Test that new objects replace records and deleted ones go"""
+        city = City(**self.city.to_dict())
+        city.name = "Oakland"
+        self.storage.new(city)
+        self.assertIs(self.storage.get(City, city.id), city)
+        self.storage.delete(self.place)
+        self.assertEqual(self.storage.count(Place), 0)
+        self.assertEqual(self.storage.related(Place, "city_id", city.id), [])
+        with open(self.path) as f:
+            records = json.load(f)
+        self.assertNotIn("Place." + self.place.id, records)
+        self.assertEqual(records["City." + city.id]["name"], "Oakland")
@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+"""
+Contains the TestJsonStreamDocs and TestJsonStream classes
+"""
+
+import io
+import json
+from models.engine import json_stream
+import pep8 as pycodestyle
+import unittest
+
+
+class TestJsonStreamDocs(unittest.TestCase):
+    """Tests to check the documentation and style of json_stream"""
+    def test_pep8_conformance_json_stream(self):
+        """Test that models/engine/json_stream.py conforms to PEP8."""
+        pep8s = pycodestyle.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/json_stream.py',
+                                    'tests/test_models/test_engine/\
+test_json_stream.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_json_stream_module_docstring(self):
+        """Test for the json_stream.py module docstring"""
+        self.assertIsNot(json_stream.__doc__, None,
+                         "json_stream.py needs a docstring")
+        self.assertTrue(len(json_stream.__doc__) >= 1,
+                        "json_stream.py needs a docstring")
+
+
+class TestJsonStream(unittest.TestCase):
+    """Test the incremental reader of JSON snapshots"""
+    records = {
+        "State.1": {"__class__": "State", "id": "1", "name": "Nevada"},
+        "Place.2": {"__class__": "Place", "id": "2", "number_rooms": 12,
+                    "latitude": -1.5e3, "amenity_ids": ["a", "b"],
+                    "description": None, "name": "\"{},: ☀\""},
+        "Review.3": {"__class__": "Review", "id": "3", "text": ""}
+    }
+
+    def test_chunk_sizes(self):
+        """Test that records are read whatever the chunk boundaries"""
+        for indent in (None, 4):
+            text = json.dumps(self.records, indent=indent)
+            for chunk_size in (1, 2, 3, 7, 64, 1 << 16):
+                with self.subTest(indent=indent, chunk_size=chunk_size):
+                    pairs = list(json_stream.iter_records(
+                        io.StringIO(text), chunk_size))
+                    self.assertEqual(pairs, list(self.records.items()))
+
+    def test_empty(self):
+        """Test that an empty object yields nothing"""
+        for text in ("{}", " { \n } "):
+            self.assertEqual(
+                list(json_stream.iter_records(io.StringIO(text), 1)), [])
+
+    def test_invalid(self):
+        """Test that truncated or invalid documents raise ValueError"""
+        text = json.dumps(self.records)
+        for bad in (text[:-1], text[:len(text) // 2], "[]", "", "{1: 2}"):
+            with self.subTest(bad=bad):
+                with self.assertRaises(ValueError):
+                    list(json_stream.iter_records(io.StringIO(bad), 5))
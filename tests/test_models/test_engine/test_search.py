@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+"""
+Contains the TestSearchDocs and TestSearch classes
+"""
+
+import models
+from models.amenity import Amenity
+from models.city import City
+from models.engine import search
+from models.place import Place
+from models.state import State
+from models.user import User
+import pep8 as pycodestyle
+from tests import search_cases
+from tests.test_models.test_engine.test_file_storage import FileStorageCase
+import unittest
+
+
+class TestSearchDocs(unittest.TestCase):
+    """Tests to check the documentation and style of search"""
+    def test_pep8_conformance_search(self):
+        """Test that models/engine/search.py conforms to PEP8."""
+        pep8s = pycodestyle.StyleGuide(quiet=True)
+        result = pep8s.check_files(['models/engine/search.py',
+                                    'tests/test_models/test_engine/\
+test_search.py'])
+        self.assertEqual(result.total_errors, 0,
+                         "Found code style errors (and warnings).")
+
+    def test_search_module_docstring(self):
+        """Test for the search.py module docstring"""
+        self.assertIsNot(search.__doc__, None,
+                         "search.py needs a docstring")
+        self.assertTrue(len(search.__doc__) >= 1,
+                        "search.py needs a docstring")
+
+
+@unittest.skipIf(models.storage_t == 'db', "not testing file storage")
+class TestSearch(FileStorageCase):
+    """Test the place search of FileStorage against a relationship walk"""
+    def setUp(self):
+        """Creates two states, three cities, two amenities and places with
+        every combination of them"""
+        super().setUp()
+        self.states = [State(name="State") for i in range(2)]
+        self.amenities = [Amenity(name="Amenity") for i in range(2)]
+        self.cities = [City(name="City", state_id=self.states[i // 2].id)
+                       for i in range(3)]
+        user = User(email="a@b.c")
+        for obj in self.states + self.amenities + self.cities + [user]:
+            self.storage.new(obj)
+        for city in self.cities:
+            for i in range(4):
+                ids = [amenity.id for j, amenity in enumerate(self.amenities)
+                       if i & (1 << j)]
+                self.storage.new(Place(name="Place", city_id=city.id,
+                                       user_id=user.id, amenity_ids=ids))
+
+    def test_same_places(self):
+        """Test the indexed search against the relationship walk"""
+        states = [s.id for s in self.states]
+        cities = [c.id for c in self.cities]
+        amenities = [a.id for a in self.amenities]
+        for body in search_cases.bodies(states, cities, amenities):
+            with self.subTest(body=body):
+                args = (body.get("states", []), body.get("cities", []),
+                        body.get("amenities", []))
+                places = self.storage.search_places(*args)
+                self.assertEqual(sorted(p.id for p in places),
+                                 search_cases.walk(self.storage, *args))
+
+    def test_order(self):
+        """Test that places come ordered by creation date then id"""
+        places = self.storage.search_places(
+            amenities=[self.amenities[0].id])
+        self.assertEqual(places, sorted(places, key=lambda p: (
+            p.created_at, p.id)))
+
+    def test_amenity_changes(self):
+        """Test that the amenity index follows the lists of amenity ids"""
+        amenity = self.amenities[0]
+        place = self.storage.get(Place, self.storage.search_places(
+            amenities=[amenity.id])[0].id)
+        place.amenity_ids = []
+        self.assertNotIn(place, self.storage.search_places(
+            amenities=[amenity.id]))
+        place.amenity_ids.append(amenity.id)
+        self.storage.new(place)
+        self.assertIn(place, self.storage.search_places(
+            amenities=[amenity.id]))
+        self.storage.delete(place)
+        self.assertNotIn(place, self.storage.search_places(
+            amenities=[amenity.id]))